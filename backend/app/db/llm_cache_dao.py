@@ -0,0 +1,90 @@
+from typing import Optional
+
+from app.db.sqlite_client import get_connection
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 毫秒精度的当前时间：CURRENT_TIMESTAMP 只精确到秒，同一秒内的命中无法区分先后，LRU 淘汰会误删刚用过的条目
+_NOW = "STRFTIME('%Y-%m-%d %H:%M:%f', 'now')"
+
+
+def init_llm_cache_table():
+    conn = get_connection()
+    if conn is None:
+        logger.error("Failed to connect to the database.")
+        return
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS llm_response_cache (
+            cache_key TEXT PRIMARY KEY,
+            model TEXT NOT NULL,
+            provider TEXT,
+            response TEXT NOT NULL,
+            hits INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_llm_response_cache_used ON llm_response_cache (last_used_at)")
+    try:
+        conn.commit()
+        conn.close()
+        logger.info("llm_response_cache table created successfully.")
+    except Exception as e:
+        logger.error(f"Failed to create llm_response_cache table: {e}")
+
+
+def get_llm_cache(cache_key: str) -> Optional[str]:
+    """
+    读取缓存的模型回复，命中时刷新最近使用时间
+
+    :return: 回复文本，未命中时返回 None
+    """
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT response FROM llm_response_cache WHERE cache_key = ?", (cache_key,))
+        row = cursor.fetchone()
+        if row is not None:
+            cursor.execute("""
+                UPDATE llm_response_cache SET hits = hits + 1, last_used_at = {_NOW}
+                WHERE cache_key = ?
+            """.format(_NOW=_NOW), (cache_key,))
+            conn.commit()
+        conn.close()
+        return row[0] if row else None
+    except Exception as e:
+        logger.error(f"Failed to get llm cache: {e}")
+        return None
+
+
+def save_llm_cache(cache_key: str, model: str, provider: Optional[str], response: str, max_entries: int):
+    """
+    写入模型回复，并按最近使用时间淘汰超出 max_entries 的旧条目
+
+    :param max_entries: 缓存条数上限
+    """
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO llm_response_cache (cache_key, model, provider, response, last_used_at)
+            VALUES (?, ?, ?, ?, {_NOW})
+            ON CONFLICT(cache_key) DO UPDATE SET
+                response = excluded.response,
+                last_used_at = excluded.last_used_at
+        """.format(_NOW=_NOW), (cache_key, model, provider, response))
+        cursor.execute("""
+            DELETE FROM llm_response_cache WHERE cache_key IN (
+                SELECT cache_key FROM llm_response_cache
+                ORDER BY last_used_at DESC, rowid DESC
+                LIMIT -1 OFFSET ?
+            )
+        """, (max_entries,))
+        if cursor.rowcount > 0:
+            logger.info(f"LLM cache evicted {cursor.rowcount} entries")
+        conn.commit()
+        conn.close()
+    except Exception as e:
+        logger.error(f"Failed to save llm cache: {e}")
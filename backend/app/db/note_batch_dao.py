@@ -0,0 +1,70 @@
+from app.db.sqlite_client import get_connection
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def init_note_batch_table():
+    conn = get_connection()
+    if conn is None:
+        logger.error("Failed to connect to the database.")
+        return
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS note_batch_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            batch_id TEXT NOT NULL,
+            task_id TEXT NOT NULL,
+            video_url TEXT NOT NULL,
+            video_id TEXT,
+            platform TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_note_batch_items_batch ON note_batch_items (batch_id, id)")
+    try:
+        conn.commit()
+        conn.close()
+        logger.info("note_batch_items table created successfully.")
+    except Exception as e:
+        logger.error(f"Failed to create note_batch_items table: {e}")
+
+
+def insert_note_batch(batch_id: str, items: list):
+    """
+    写入一个批次的全部条目
+
+    :param items: [{"task_id", "video_url", "video_id", "platform"}, ...]
+    """
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.executemany("""
+            INSERT INTO note_batch_items (batch_id, task_id, video_url, video_id, platform)
+            VALUES (?, ?, ?, ?, ?)
+        """, [(batch_id, item["task_id"], item["video_url"], item.get("video_id"), item["platform"]) for item in items])
+        conn.commit()
+        conn.close()
+        logger.info(f"Note batch inserted successfully. batch_id: {batch_id}, items: {len(items)}")
+    except Exception as e:
+        logger.error(f"Failed to insert note batch: {e}")
+
+
+def get_note_batch_items(batch_id: str) -> list:
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT task_id, video_url, video_id, platform FROM note_batch_items
+            WHERE batch_id = ?
+            ORDER BY id ASC
+        """, (batch_id,))
+        rows = cursor.fetchall()
+        conn.close()
+        return [
+            {"task_id": row[0], "video_url": row[1], "video_id": row[2], "platform": row[3]}
+            for row in rows
+        ]
+    except Exception as e:
+        logger.error(f"Failed to get note batch: {e}")
+        return []
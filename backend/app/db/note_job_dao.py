@@ -0,0 +1,177 @@
+import json
+
+from app.db.sqlite_client import get_connection
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+def init_note_job_table():
+    conn = get_connection()
+    if conn is None:
+        logger.error("Failed to connect to the database.")
+        return
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS note_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            task_id TEXT NOT NULL UNIQUE,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_note_jobs_status ON note_jobs (status, id)")
+    try:
+        conn.commit()
+        conn.close()
+        logger.info("note_jobs table created successfully.")
+    except Exception as e:
+        logger.error(f"Failed to create note_jobs table: {e}")
+
+
+def enqueue_note_job(task_id: str, payload: dict) -> bool:
+    """
+    写入一个排队任务；同一 task_id 重试时删除旧记录后重新插入，排到队尾（正在执行的任务不受影响）
+
+    :return: 是否入队成功
+    """
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        # 领取按 id 排序，重新插入获得新 id，重试的任务不会插到先前排队的任务前面
+        cursor.execute("DELETE FROM note_jobs WHERE task_id = ? AND status != 'running'", (task_id,))
+        cursor.execute("""
+            INSERT INTO note_jobs (task_id, payload, status)
+            VALUES (?, ?, 'queued')
+            ON CONFLICT(task_id) DO NOTHING
+        """, (task_id, json.dumps(payload, ensure_ascii=False)))
+        changed = cursor.rowcount > 0
+        conn.commit()
+        conn.close()
+        if not changed:
+            logger.info(f"Note job is already running, skip enqueue. task_id: {task_id}")
+        return changed
+    except Exception as e:
+        logger.error(f"Failed to enqueue note job: {e}")
+        return False
+
+
+def claim_next_note_job():
+    """
+    按入队顺序取出一个排队任务并标记为 running
+
+    :return: (task_id, payload) 或 None
+    """
+    conn = get_connection()
+    try:
+        # IMMEDIATE 事务保证多个 worker 不会领取到同一个任务
+        conn.isolation_level = None
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute("""
+            SELECT task_id, payload FROM note_jobs
+            WHERE status = 'queued'
+            ORDER BY id ASC
+            LIMIT 1
+        """)
+        row = cursor.fetchone()
+        if row is None:
+            cursor.execute("COMMIT")
+            return None
+        cursor.execute("""
+            UPDATE note_jobs
+            SET status = 'running', attempts = attempts + 1, updated_at = CURRENT_TIMESTAMP
+            WHERE task_id = ?
+        """, (row[0],))
+        cursor.execute("COMMIT")
+        return row[0], json.loads(row[1])
+    except Exception as e:
+        logger.error(f"Failed to claim note job: {e}")
+        try:
+            conn.execute("ROLLBACK")
+        except Exception:
+            pass
+        return None
+    finally:
+        conn.close()
+
+
+def update_note_job_status(task_id: str, status: str):
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE note_jobs
+            SET status = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE task_id = ?
+        """, (status, task_id))
+        conn.commit()
+        conn.close()
+    except Exception as e:
+        logger.error(f"Failed to update note job status: {e}")
+
+
+def requeue_running_note_jobs() -> int:
+    """
+    进程重启后，把上次未执行完的任务重新放回队列
+
+    :return: 恢复的任务数
+    """
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE note_jobs
+            SET status = 'queued', updated_at = CURRENT_TIMESTAMP
+            WHERE status = 'running'
+        """)
+        conn.commit()
+        count = cursor.rowcount
+        conn.close()
+        return count
+    except Exception as e:
+        logger.error(f"Failed to requeue running note jobs: {e}")
+        return 0
+
+
+def count_note_jobs_by_status() -> dict:
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT status, COUNT(*) FROM note_jobs GROUP BY status")
+        rows = cursor.fetchall()
+        conn.close()
+        return {row[0]: row[1] for row in rows}
+    except Exception as e:
+        logger.error(f"Failed to count note jobs: {e}")
+        return {}
+
+
+def get_note_job_position(task_id: str):
+    """
+    查询排队任务前面还有多少个任务
+
+    :return: 排队位置（从 1 开始），任务不在排队状态时返回 None
+    """
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT COUNT(*) FROM note_jobs
+            WHERE status = 'queued'
+              AND id <= (SELECT id FROM note_jobs WHERE task_id = ? AND status = 'queued')
+        """, (task_id,))
+        row = cursor.fetchone()
+        conn.close()
+        return row[0] if row and row[0] else None
+    except Exception as e:
+        logger.error(f"Failed to get note job position: {e}")
+        return None
@@ -1,7 +1,7 @@
 import enum
 
 from abc import ABC, abstractmethod
-from typing import Optional, Union
+from typing import List, Optional, Union
 
 from app.enmus.note_enums import DownloadQuality
 from app.models.notes_model import AudioDownloadResult
@@ -14,6 +14,9 @@ QUALITY_MAP = {
 
 
 class Downloader(ABC):
+    # 视频与音频能否并行下载；download_video 内部复用 download 的下载器应设为 False，避免并发写同一文件
+    parallel_video_download: bool = True
+
     def __init__(self):
         #TODO 需要修改为可配置
         self.quality = QUALITY_MAP.get('fast')
@@ -36,3 +39,42 @@ class Downloader(ABC):
     def download_video(self, video_url: str,
                        output_dir: Union[str, None] = None) -> str:
         pass
+
+    def expand(self, video_url: str) -> List[str]:
+        """
+        把合集/播放列表/多P 链接展开为单个视频链接，供批量生成使用；
+        不支持展开的平台原样返回
+
+        :param video_url: 资源链接
+        :return: 单个视频链接列表
+        """
+        return [video_url]
+
+    @staticmethod
+    def _expand_with_ytdlp(video_url: str) -> List[str]:
+        """
+        用 yt-dlp 的 extract_flat 只解析列表条目而不下载，单个视频时返回原链接
+        """
+        import yt_dlp
+
+        ydl_opts = {
+            'extract_flat': 'in_playlist',
+            'noplaylist': False,
+            'skip_download': True,
+            'quiet': True,
+        }
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(video_url, download=False)
+
+        entries = info.get("entries") if info else None
+        if not entries:
+            return [video_url]
+
+        urls = []
+        for entry in entries:
+            if not entry:
+                continue
+            url = entry.get("url") or entry.get("webpage_url")
+            if url:
+                urls.append(url)
+        return urls or [video_url]
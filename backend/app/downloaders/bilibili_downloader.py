@@ -1,6 +1,6 @@
 import os
 from abc import ABC
-from typing import Union, Optional
+from typing import List, Union, Optional
 
 import yt_dlp
 
@@ -14,6 +14,10 @@ class BilibiliDownloader(Downloader, ABC):
     def __init__(self):
         super().__init__()
 
+    def expand(self, video_url: str) -> List[str]:
+        # 多P 视频、合集展开为逐个视频的链接
+        return self._expand_with_ytdlp(video_url)
+
     def download(
         self,
         video_url: str,
@@ -13,6 +13,8 @@ from app.utils.path_helper import get_data_dir
 
 
 class KuaiShouDownloader(Downloader, ABC):
+    parallel_video_download = False
+
     def __init__(self):
         super().__init__()
 
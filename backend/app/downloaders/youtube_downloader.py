@@ -1,6 +1,6 @@
 import os
 from abc import ABC
-from typing import Union, Optional
+from typing import List, Union, Optional
 
 import yt_dlp
 
@@ -15,6 +15,10 @@ class YoutubeDownloader(Downloader, ABC):
 
         super().__init__()
 
+    def expand(self, video_url: str) -> List[str]:
+        # 播放列表展开为逐个视频的链接
+        return self._expand_with_ytdlp(video_url)
+
     def download(
         self,
         video_url: str,
@@ -54,7 +58,7 @@ class YoutubeDownloader(Downloader, ABC):
             cover_url=cover_url,
             platform="youtube",
             video_id=video_id,
-            raw_info={'tags':info.get('tags')}, #全部返回会报错
+            raw_info={'tags':info.get('tags'), 'language': info.get('language')}, #全部返回会报错
             video_path=None  # ❗音频下载不包含视频路径
         )
 
@@ -26,3 +26,21 @@ class TaskStatus(str, enum.Enum):
             cls.FAILED: "失败",
         }
         return desc_map.get(status, "未知状态")
+
+    @classmethod
+    def progress(cls, status):
+        """
+        各阶段对应的大致进度（0-100），用于进度推送
+        """
+        progress_map = {
+            cls.PENDING: 0,
+            cls.PARSING: 5,
+            cls.DOWNLOADING: 15,
+            cls.TRANSCRIBING: 35,
+            cls.SUMMARIZING: 70,
+            cls.FORMATTING: 90,
+            cls.SAVING: 95,
+            cls.SUCCESS: 100,
+            cls.FAILED: 100,
+        }
+        return progress_map.get(status, 0)
@@ -4,13 +4,32 @@ from app.models.gpt_model import GPTSource
 
 
 class GPT(ABC):
-    def summarize(self, source:GPTSource )->str:
+    def summarize(self, source:GPTSource, on_token=None)->str:
         '''
 
         :param source: 
+        :param on_token: 可选回调，流式生成时每收到一段文本调用一次
         :return:
         '''
         pass
+    def summarize_partial(self, source: GPTSource, segments: list, index: int) -> str:
+        '''
+        分段总结（map）：提炼某一时间窗口内转录片段的要点
+        :param source: 笔记的整体信息（标题、标签等）
+        :param segments: 该窗口内的转录片段
+        :param index: 窗口序号，从 1 开始
+        :return: 该片段的要点文本
+        '''
+        pass
+    def merge_partials(self, source: GPTSource, partials: list, on_token=None) -> str:
+        '''
+        合并总结（reduce）：把各片段要点合并成最终笔记
+        :param source: 笔记的整体信息与格式、风格要求
+        :param partials: 按时间顺序排列的片段要点
+        :param on_token: 可选回调，流式生成时每收到一段文本调用一次
+        :return: 最终 Markdown
+        '''
+        pass
     def create_messages(self, segments:list,**kwargs)->list:
         pass
     def list_models(self):
@@ -0,0 +1,69 @@
+import re
+from typing import List
+
+from app.models.transcriber_model import TranscriptSegment
+
+try:
+    import tiktoken
+
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    # tiktoken 为可选依赖，未安装时使用字符数估算
+    _ENCODING = None
+
+_CJK_PATTERN = re.compile(r"[　-〿㐀-䶿一-鿿＀-￯]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    估算文本的 token 数：优先使用 tiktoken，否则按中文字符约 1 token、其他字符约 4 个 1 token 估算
+
+    :param text: 文本
+    :return: token 数
+    """
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    cjk = len(_CJK_PATTERN.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def split_segments(
+    segments: List[TranscriptSegment],
+    max_tokens: int,
+    min_silence_gap: float = 1.5,
+    soft_ratio: float = 0.8,
+) -> List[List[TranscriptSegment]]:
+    """
+    按 token 预算切分转录片段，尽量在停顿处断开：
+
+    - 累计 token 超过 max_tokens * soft_ratio 后，遇到与上一片段间隔 >= min_silence_gap 的停顿即切分
+    - 累计 token 达到 max_tokens 时无论是否有停顿都强制切分
+
+    :param segments: 按时间排序的转录片段
+    :param max_tokens: 每个分块的 token 上限
+    :param min_silence_gap: 视为停顿的最小间隔（秒）
+    :param soft_ratio: 开始寻找停顿的预算比例
+    :return: 分块列表
+    """
+    chunks: List[List[TranscriptSegment]] = []
+    current: List[TranscriptSegment] = []
+    current_tokens = 0
+    soft_limit = max_tokens * soft_ratio
+
+    for seg in segments:
+        # 每行额外带一个 “mm:ss - ” 时间前缀
+        seg_tokens = estimate_tokens(seg.text) + 4
+        if current:
+            gap = seg.start - current[-1].end
+            at_pause = current_tokens >= soft_limit and gap >= min_silence_gap
+            if at_pause or current_tokens + seg_tokens > max_tokens:
+                chunks.append(current)
+                current, current_tokens = [], 0
+        current.append(seg)
+        current_tokens += seg_tokens
+
+    if current:
+        chunks.append(current)
+    return chunks
@@ -0,0 +1,116 @@
+import os
+import re
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from app.gpt.chunking import estimate_tokens
+from app.models.transcriber_model import TranscriptSegment
+
+# 是否在总结前压缩转录文本
+TRANSCRIPT_COMPACTION = os.getenv("TRANSCRIPT_COMPACTION", "true").lower() in ("1", "true", "yes")
+# 合并后每段的最长时长（秒），即时间戳的最大间隔，保证 *Content-[mm:ss] 仍能定位到附近
+COMPACT_MAX_SECONDS = float(os.getenv("COMPACT_MAX_SECONDS", 30))
+# 达到该时长后遇到句末标点即断开
+COMPACT_MIN_SECONDS = 10.0
+# 超过该停顿（秒）视为换段
+COMPACT_PARAGRAPH_GAP = 2.0
+
+# 只删除独立出现的语气词，不动“那个”“就是”等可能有实际含义的词
+_FILLER_PATTERN = re.compile(
+    r"(?:(?<=^)|(?<=[\s，,。.！!？?、]))"
+    r"(?:嗯+|啊+|呃+|额+|唔+|哦+|诶+|欸+|um+|uh+|erm+|hmm+|ah+)"
+    r"(?=$|[\s，,。.！!？?、])[\s，,、]*",
+    re.IGNORECASE,
+)
+_SENTENCE_END = ("。", "！", "？", ".", "!", "?", "…")
+_CJK_CHAR = re.compile(r"[　-〿㐀-䶿一-鿿＀-￯]")
+_NORMALIZE = re.compile(r"[\s\W_]+")
+
+
+@dataclass
+class CompactionStats:
+    segments_before: int
+    segments_after: int
+    tokens_before: int
+    tokens_after: int
+
+    @property
+    def saved_ratio(self) -> float:
+        return 1 - self.tokens_after / self.tokens_before if self.tokens_before else 0.0
+
+
+def strip_fillers(text: str) -> str:
+    text = _FILLER_PATTERN.sub("", text.strip())
+    # 只剩标点时视为空
+    return text.strip() if _NORMALIZE.sub("", text) else ""
+
+
+def _join(left: str, right: str) -> str:
+    # 上一片段以中文标点结尾时直接拼接，否则用空格分隔（ASR 的中文片段常无标点，保留原有断句）
+    if _CJK_CHAR.match(left[-1:]) and not left[-1].isalnum():
+        return left + right
+    return f"{left} {right}"
+
+
+def compact_segments(segments: List[TranscriptSegment]) -> List[TranscriptSegment]:
+    """
+    把 ASR 产出的大量短片段合并为句/段级别的单元：
+
+    - 删除独立的语气词，以及只剩语气词或标点的片段
+    - 删除与上一片段内容相同的重复片段（如模型循环输出的“谢谢观看”）
+    - 相邻片段合并，遇到较长停顿、时长达到 COMPACT_MAX_SECONDS，
+      或时长超过 COMPACT_MIN_SECONDS 后遇到句末标点时断开
+
+    合并后的单元保留第一个片段的开始时间，时间戳间隔不超过 COMPACT_MAX_SECONDS。
+
+    :param segments: 按时间排序的转录片段
+    :return: 合并后的片段
+    """
+    units: List[TranscriptSegment] = []
+    last_key = None
+    # 最近一段语音（含被删除的语气词片段）的结束时间：删掉语气词不应被当作停顿而断段
+    spoken_until = None
+    for seg in segments:
+        text = strip_fillers(seg.text)
+        if not text:
+            if units and seg.start - spoken_until < COMPACT_PARAGRAPH_GAP:
+                spoken_until = max(spoken_until, seg.end)
+            continue
+        key = _NORMALIZE.sub("", text).lower()
+        if key == last_key:
+            units[-1].end = max(units[-1].end, seg.end)
+            spoken_until = max(spoken_until, seg.end)
+            continue
+        last_key = key
+
+        if units:
+            unit = units[-1]
+            duration = seg.end - unit.start
+            gap = seg.start - spoken_until
+            sentence_done = unit.end - unit.start >= COMPACT_MIN_SECONDS and unit.text.endswith(_SENTENCE_END)
+            if gap < COMPACT_PARAGRAPH_GAP and duration <= COMPACT_MAX_SECONDS and not sentence_done:
+                unit.text = _join(unit.text, text)
+                unit.end = seg.end
+                spoken_until = seg.end
+                continue
+        units.append(TranscriptSegment(start=seg.start, end=seg.end, text=text))
+        spoken_until = seg.end
+    return units
+
+
+def compact_transcript(segments: List[TranscriptSegment], format_line) -> Tuple[List[TranscriptSegment], CompactionStats]:
+    """
+    压缩转录并统计 token 节省情况
+
+    :param segments: 转录片段
+    :param format_line: 把片段格式化为 Prompt 中一行的函数，用于估算 token
+    :return: (压缩后的片段, 统计)
+    """
+    compacted = compact_segments(segments)
+    stats = CompactionStats(
+        segments_before=len(segments),
+        segments_after=len(compacted),
+        tokens_before=estimate_tokens("\n".join(format_line(seg) for seg in segments)),
+        tokens_after=estimate_tokens("\n".join(format_line(seg) for seg in compacted)),
+    )
+    return compacted, stats
@@ -8,6 +8,10 @@ from app.models.model_config import ModelConfig
 
 class GPTFactory:
     @staticmethod
-    def from_config(config: ModelConfig) -> GPT:
+    def from_config(config: ModelConfig, use_cache: bool = True) -> GPT:
+        """
+        :param use_cache: 为 False 时跳过模型回复缓存的读取（见 UniversalGPT）
+        """
         client = OpenAICompatibleProvider(api_key=config.api_key, base_url=config.base_url).get_client
-        return UniversalGPT(client=client, model=config.model_name)
\ No newline at end of file
+        return UniversalGPT(client=client, model=config.model_name, provider=f"{config.provider}@{config.base_url}",
+                            use_cache=use_cache)
\ No newline at end of file
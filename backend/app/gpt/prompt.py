@@ -66,4 +66,18 @@ SCREENSHOT='''
 8. **Screenshot placeholders**: If a section involves **visual demonstrations, code walkthroughs, UI interactions**, or any content where visuals aid understanding, insert a screenshot cue at the end of that section:
    - Format: `*Screenshot-[mm:ss]`
    - Only use it when truly helpful.
-'''
\ No newline at end of file
+'''
+MAP_PROMPT = '''
+你是一个专业的笔记助手。下面是视频《{video_title}》中的一个片段（第 {index} 段，时间范围 {start_time} - {end_time}）的转录内容，
+格式为“开始时间 - 内容”：
+
+---
+{segment_text}
+---
+
+请提炼这一片段的内容要点，之后会与其他片段的要点合并生成完整笔记：
+1. 按内容顺序输出要点，每条要点单独一行，格式为 `mm:ss - 要点内容`，时间取该要点在原视频中的开始时间。
+2. 保留重要事实、示例、数据、结论、步骤、数学公式（LaTeX）和专有名词。
+3. 省略广告、填充词、问候语和不相关的言论。
+4. 只输出要点行，不要添加标题、前言或总结，不要包裹在代码块中。
+'''
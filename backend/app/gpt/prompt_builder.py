@@ -1,4 +1,4 @@
-from app.gpt.prompt import BASE_PROMPT
+from app.gpt.prompt import BASE_PROMPT, MAP_PROMPT
 
 note_formats = [
     {'label': '目录', 'value': 'toc'},
@@ -43,6 +43,17 @@ def generate_base_prompt(title, segment_text, tags, _format=None, style=None, ex
     return prompt
 
 
+# 生成分段要点提炼（map 阶段）的 Prompt
+def generate_map_prompt(title, segment_text, index, start_time, end_time):
+    return MAP_PROMPT.format(
+        video_title=title,
+        segment_text=segment_text,
+        index=index,
+        start_time=start_time,
+        end_time=end_time,
+    )
+
+
 # 获取格式函数
 def get_format_function(format_type):
     format_map = {
@@ -1,13 +1,93 @@
-from typing import Optional, Union
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple, Union
 
-from openai import OpenAI
+from openai import DefaultHttpxClient, OpenAI
 
 from app.utils.logger import get_logger
 
 logging= get_logger(__name__)
+
+try:
+    import h2  # noqa: F401
+
+    # HTTP/2 为可选项：h2 不在依赖列表中，手动 pip install h2 后启用，同一服务商的并发请求复用一条连接
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# 同时保留的客户端数量上限，超出时移除最久未使用的客户端
+OPENAI_CLIENT_CACHE_SIZE = int(os.getenv("OPENAI_CLIENT_CACHE_SIZE") or 16)
+
+
+class _PooledHttpxClient(DefaultHttpxClient):
+    """
+    注册表中客户端使用的连接池。移出注册表时不主动关闭（进行中的任务可能仍持有该客户端），
+    最后一个引用释放、对象被回收时再关闭
+    """
+
+    def __del__(self) -> None:
+        if self.is_closed:
+            return
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+# 按 (base_url, api_key 的哈希) 复用的客户端，每个客户端自带连接池，跨任务保持连接
+_clients: "OrderedDict[Tuple[str, str], OpenAI]" = OrderedDict()
+_clients_lock = threading.Lock()
+# 客户端失效时的回调，缓存了服务商配置的模块（如 Groq 转写器）借此丢弃旧配置
+_invalidation_listeners: List[Callable[[], None]] = []
+
+
+def add_invalidation_listener(listener: Callable[[], None]) -> None:
+    """注册服务商配置变更或删除时的回调"""
+    _invalidation_listeners.append(listener)
+
+
+def _client_key(api_key: Optional[str], base_url: Optional[str]) -> Tuple[str, str]:
+    # 不在内存中的键里保留明文密钥
+    return base_url or "", hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()
+
+
+def get_openai_client(api_key: str, base_url: str) -> OpenAI:
+    """
+    获取（必要时创建）指定服务商配置的 OpenAI 客户端，客户端线程安全，可在多个任务间共享
+    """
+    key = _client_key(api_key, base_url)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = OpenAI(api_key=api_key, base_url=base_url,
+                            http_client=_PooledHttpxClient(http2=HTTP2_AVAILABLE))
+            _clients[key] = client
+            logging.info(f"创建 OpenAI 客户端：{base_url}（HTTP/2：{HTTP2_AVAILABLE}）")
+            while len(_clients) > OPENAI_CLIENT_CACHE_SIZE:
+                (old_base_url, _), _ = _clients.popitem(last=False)
+                logging.info(f"移除最久未使用的 OpenAI 客户端：{old_base_url}")
+        else:
+            _clients.move_to_end(key)
+    return client
+
+
+def invalidate_openai_client(api_key: Optional[str], base_url: Optional[str]) -> None:
+    """
+    服务商配置变更或删除后移除旧客户端；正在使用它的任务不受影响，连接池在最后一个引用释放时关闭
+    """
+    with _clients_lock:
+        if _clients.pop(_client_key(api_key, base_url), None) is not None:
+            logging.info(f"移除 OpenAI 客户端：{base_url}")
+    for listener in _invalidation_listeners:
+        listener()
+
+
 class OpenAICompatibleProvider:
     def __init__(self, api_key: str, base_url: str, model: Union[str, None]=None):
-        self.client = OpenAI(api_key=api_key, base_url=base_url)
+        self.client = get_openai_client(api_key=api_key, base_url=base_url)
         self.model = model
 
     @property
@@ -17,7 +97,7 @@ class OpenAICompatibleProvider:
     @staticmethod
     def test_connection(api_key: str, base_url: str) -> bool:
         try:
-            client = OpenAI(api_key=api_key, base_url=base_url)
+            client = get_openai_client(api_key=api_key, base_url=base_url)
             model = client.models.list()
             # for segment in model:
             #     print(segment)
@@ -25,6 +105,7 @@ class OpenAICompatibleProvider:
             logging.info("连通性测试成功")
             return True
         except Exception as e:
+            # 不移除共享客户端：同一配置可能正被其他任务使用，失败也可能只是暂时的网络问题
             logging.info(f"连通性测试失败：{e}")
 
             # print(f"Error connecting to OpenAI API: {e}")
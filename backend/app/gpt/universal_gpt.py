@@ -1,18 +1,50 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from app.db.llm_cache_dao import get_llm_cache, save_llm_cache
 from app.gpt.base import GPT
-from app.gpt.prompt_builder import generate_base_prompt
+from app.gpt.chunking import estimate_tokens, split_segments
+from app.gpt.compaction import TRANSCRIPT_COMPACTION, compact_transcript
+from app.gpt.prompt_builder import generate_base_prompt, generate_map_prompt
 from app.models.gpt_model import GPTSource
 from app.gpt.prompt import BASE_PROMPT, AI_SUM, SCREENSHOT, LINK
 from app.gpt.utils import fix_markdown
 from app.models.transcriber_model import TranscriptSegment
 from datetime import timedelta
-from typing import List
+from typing import Callable, List, Optional
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 分块总结模式：auto（转录超过 token 预算时启用）、on（总是启用）、off（关闭）
+GPT_MAP_REDUCE = os.getenv("GPT_MAP_REDUCE", "auto").lower()
+# 单个分块（及整段直接总结）允许的转录 token 上限
+GPT_CHUNK_TOKENS = int(os.getenv("GPT_CHUNK_TOKENS", 12000))
+# 同时进行的分块总结请求数
+GPT_MAP_CONCURRENCY = int(os.getenv("GPT_MAP_CONCURRENCY", 4))
+# 最终总结是否以流式方式请求，生成过程中即可读取部分结果
+GPT_STREAM = os.getenv("GPT_STREAM", "true").lower() in ("1", "true", "yes")
+# 模型回复缓存：消息、模型、温度与服务商完全相同的请求直接返回上次的回复
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "true").lower() in ("1", "true", "yes")
+# 缓存条数上限，超出时淘汰最久未使用的条目
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 2000))
 
 
 class UniversalGPT(GPT):
-    def __init__(self, client, model: str, temperature: float = 0.7):
+    def __init__(self, client, model: str, temperature: float = 0.7, provider: Optional[str] = None,
+                 use_cache: bool = True):
+        """
+        :param provider: 服务商标识，参与回复缓存的键
+        :param use_cache: 为 False 时不读取缓存（仍写入新回复），用于强制重新生成
+        """
         self.client = client
         self.model = model
         self.temperature = temperature
+        self.provider = provider
+        self.use_cache = use_cache
         self.screenshot = False
         self.link = False
 
@@ -28,11 +60,22 @@ class UniversalGPT(GPT):
     def ensure_segments_type(self, segments) -> List[TranscriptSegment]:
         return [TranscriptSegment(**seg) if isinstance(seg, dict) else seg for seg in segments]
 
+    def _compact(self, segments: List[TranscriptSegment]) -> List[TranscriptSegment]:
+        # 合并短片段、去掉语气词与重复行，减少 Prompt 中的时间戳与 token
+        if not TRANSCRIPT_COMPACTION or len(segments) < 2:
+            return segments
+        compacted, stats = compact_transcript(
+            segments, lambda seg: f"{self._format_time(seg.start)} - {seg.text.strip()}"
+        )
+        logger.info(f"转录压缩：{stats.segments_before} 段 -> {stats.segments_after} 段，"
+                    f"约 {stats.tokens_before} -> {stats.tokens_after} tokens（节省 {stats.saved_ratio:.0%}）")
+        return compacted
+
     def create_messages(self, segments: List[TranscriptSegment], **kwargs):
 
         content_text = generate_base_prompt(
             title=kwargs.get('title'),
-            segment_text=self._build_segment_text(segments),
+            segment_text=kwargs.get('segment_text') or self._build_segment_text(segments),
             tags=kwargs.get('tags'),
             _format=kwargs.get('_format'),
             style=kwargs.get('style'),
@@ -63,10 +106,98 @@ class UniversalGPT(GPT):
     def list_models(self):
         return self.client.models.list()
 
-    def summarize(self, source: GPTSource) -> str:
+    def _cache_key(self, messages: list) -> str:
+        # 图片（base64 data url）以摘要参与计算，键只依赖内容本身
+        def normalize(part):
+            if isinstance(part, dict) and part.get("type") == "image_url":
+                url = part.get("image_url", {}).get("url", "")
+                return {"type": "image_url", "sha256": hashlib.sha256(url.encode("utf-8")).hexdigest()}
+            return part
+
+        normalized = [
+            {**message, "content": [normalize(part) for part in message["content"]]}
+            if isinstance(message.get("content"), list) else message
+            for message in messages
+        ]
+        payload = json.dumps({
+            "messages": normalized,
+            "model": self.model,
+            "temperature": self.temperature,
+            "provider": self.provider,
+        }, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _complete(self, messages: list, on_token: Optional[Callable[[str], None]] = None) -> str:
+        cache_key = self._cache_key(messages) if LLM_CACHE_ENABLED else None
+        if cache_key and self.use_cache:
+            cached = get_llm_cache(cache_key)
+            if cached is not None:
+                logger.info(f"命中模型回复缓存 (model={self.model}, key={cache_key[:12]})")
+                if on_token:
+                    on_token(cached)
+                return cached
+
+        content = self._request(messages, on_token=on_token)
+        if cache_key and content:
+            save_llm_cache(cache_key, self.model, self.provider, content, LLM_CACHE_MAX_ENTRIES)
+        return content
+
+    def _request(self, messages: list, on_token: Optional[Callable[[str], None]] = None) -> str:
+        if on_token and GPT_STREAM:
+            received = [False]
+
+            def forward(delta: str) -> None:
+                received[0] = True
+                on_token(delta)
+
+            try:
+                return self._complete_stream(messages, forward)
+            except Exception as e:
+                # 尚未收到任何内容时（如服务商不支持流式）改用普通请求，否则直接报错
+                if received[0]:
+                    raise
+                logger.warning(f"流式请求失败，改用普通请求：{e}")
+
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=self.temperature
+        )
+        return response.choices[0].message.content.strip()
+
+    def _complete_stream(self, messages: list, on_token: Callable[[str], None]) -> str:
+        # 与普通请求参数一致，拼接后的全文同样 strip，结果与非流式调用相同
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=self.temperature,
+            stream=True
+        )
+        parts = []
+        for chunk in stream:
+            # 部分服务商会在末尾发送不含 choices 的用量统计
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                on_token(delta)
+        return "".join(parts).strip()
+
+    def _should_map_reduce(self, segments: List[TranscriptSegment]) -> bool:
+        if GPT_MAP_REDUCE == "off" or len(segments) < 2:
+            return False
+        if GPT_MAP_REDUCE == "on":
+            return True
+        return estimate_tokens(self._build_segment_text(segments)) > GPT_CHUNK_TOKENS
+
+    def summarize(self, source: GPTSource, on_token: Optional[Callable[[str], None]] = None) -> str:
         self.screenshot = source.screenshot
         self.link = source.link
-        source.segment = self.ensure_segments_type(source.segment)
+        source.segment = self._compact(self.ensure_segments_type(source.segment))
+
+        if self._should_map_reduce(source.segment):
+            return self.summarize_chunked(source, on_token=on_token)
 
         messages = self.create_messages(
             source.segment,
@@ -77,9 +208,56 @@ class UniversalGPT(GPT):
             style=source.style,
             extras=source.extras
         )
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            temperature=0.7
+        return self._complete(messages, on_token=on_token)
+
+    def summarize_partial(self, source: GPTSource, segments: List[TranscriptSegment], index: int) -> str:
+        # 流式总结的时间窗口是原始转录，先压缩再提炼要点
+        return self._summarize_chunk(source, self._compact(self.ensure_segments_type(segments)), index)
+
+    def _summarize_chunk(self, source: GPTSource, segments: List[TranscriptSegment], index: int) -> str:
+        # segments 须已压缩：summarize() 在分块前已整体压缩过一次，不再重复压缩
+        content_text = generate_map_prompt(
+            title=source.title,
+            segment_text=self._build_segment_text(segments),
+            index=index,
+            start_time=self._format_time(segments[0].start) if segments else "00:00",
+            end_time=self._format_time(segments[-1].end) if segments else "00:00",
         )
-        return response.choices[0].message.content.strip()
+        return self._complete([{"role": "user", "content": content_text}])
+
+    def summarize_chunked(self, source: GPTSource, on_token: Optional[Callable[[str], None]] = None) -> str:
+        """
+        分块总结：按 token 预算与停顿切分转录，并发提炼各分块要点（map），再合并为最终笔记（reduce）。
+        只有合并请求以流式输出，分块要点不推送给 on_token。
+        """
+        segments = self.ensure_segments_type(source.segment)
+        chunks = split_segments(segments, max_tokens=GPT_CHUNK_TOKENS)
+        if len(chunks) < 2:
+            return self.merge_partials(source, [self._build_segment_text(segments)], on_token=on_token)
+
+        logger.info(f"转录内容较长，分 {len(chunks)} 块并发总结（并发数 {GPT_MAP_CONCURRENCY}）")
+        with ThreadPoolExecutor(max_workers=max(1, GPT_MAP_CONCURRENCY), thread_name_prefix="gpt-map") as executor:
+            futures = [
+                executor.submit(self._summarize_chunk, source, chunk, index)
+                for index, chunk in enumerate(chunks, start=1)
+            ]
+            partials = [future.result() for future in futures]
+        return self.merge_partials(source, partials, on_token=on_token)
+
+    def merge_partials(self, source: GPTSource, partials: List[str],
+                       on_token: Optional[Callable[[str], None]] = None) -> str:
+        # 片段要点沿用“开始时间 - 内容”的行格式，直接代替原始转录放入基础 Prompt，
+        # 因此格式/风格要求及 *Content-[mm:ss]、*Screenshot-[mm:ss] 标记与整段总结一致
+        self.screenshot = source.screenshot
+        self.link = source.link
+        messages = self.create_messages(
+            [],
+            segment_text="\n".join(p.strip() for p in partials if p and p.strip()),
+            title=source.title,
+            tags=source.tags,
+            video_img_urls=source.video_img_urls,
+            _format=source._format,
+            style=source.style,
+            extras=source.extras
+        )
+        return self._complete(messages, on_token=on_token)
@@ -1,9 +1,13 @@
+import os
+
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional
 from app.utils.response import ResponseWrapper as R
 
 from app.services.cookie_manager import CookieConfigManager
+from app.transcriber.whisper import MODEL_MAP
+from app.transcriber.whisper_tuning import DEFAULT_CLIP_SECONDS, get_calibration_status, start_calibration
 
 router = APIRouter()
 cookie_manager = CookieConfigManager()
@@ -30,3 +34,24 @@ def update_cookie(data: CookieUpdateRequest):
     return R.success(
 
     )
+
+
+class WhisperCalibrationRequest(BaseModel):
+    model_size: Optional[str] = None
+    clip_seconds: int = DEFAULT_CLIP_SECONDS
+
+
+@router.post("/whisper_calibration")
+def run_whisper_calibration(data: WhisperCalibrationRequest):
+    """在后台测试本机最快的 faster-whisper 配置，结果在重启服务后生效"""
+    model_size = data.model_size or os.getenv("WHISPER_MODEL_SIZE", "base")
+    if model_size not in MODEL_MAP:
+        return R.error(msg=f"不支持的模型大小：{model_size}", code=400)
+    if not start_calibration(model_size, clip_seconds=max(5, min(data.clip_seconds, 120))):
+        return R.error(msg="已有校准任务在运行", code=409)
+    return R.success(get_calibration_status(model_size), msg="校准已开始")
+
+
+@router.get("/whisper_calibration")
+def whisper_calibration_status(model_size: Optional[str] = None):
+    return R.success(get_calibration_status(model_size or os.getenv("WHISPER_MODEL_SIZE", "base")))
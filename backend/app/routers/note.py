@@ -1,23 +1,31 @@
 # app/routers/note.py
+import asyncio
 import json
 import os
 import uuid
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 from urllib.parse import urlparse
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks, UploadFile, File
+from fastapi import APIRouter, HTTPException, UploadFile, File
 from pydantic import BaseModel, validator, field_validator
 from dataclasses import asdict
 
+from app.db.note_batch_dao import get_note_batch_items, insert_note_batch
 from app.db.video_task_dao import get_task_by_video
 from app.enmus.exception import NoteErrorEnum
 from app.enmus.note_enums import DownloadQuality
 from app.exceptions.note import NoteError
+from app.services.constant import SUPPORT_PLATFORM_MAP
 from app.services.note import NoteGenerator, logger
+from app.services.task_events import task_event_bus
+from app.services.task_queue import NoteTaskQueue
+from app.services.task_status_registry import task_status_registry
+from app.transcriber.transcriber_provider import get_warmup_status, wait_transcriber_ready
+from app.transcriber.whisper_profiles import WHISPER_PROFILES
 from app.utils.response import ResponseWrapper as R
 from app.utils.url_parser import extract_video_id
-from app.validators.video_url_validator import is_supported_video_url
+from app.validators.video_url_validator import is_supported_batch_url, is_supported_video_url
 from fastapi import APIRouter, Request, HTTPException
 from fastapi.responses import StreamingResponse
 import httpx
@@ -34,6 +42,12 @@ class RecordRequest(BaseModel):
     platform: str
 
 
+def _validate_transcriber_profile(profile: Optional[str]) -> Optional[str]:
+    if profile and profile not in WHISPER_PROFILES:
+        raise ValueError(f"不支持的转写预设：{profile}，可选 {', '.join(WHISPER_PROFILES)}")
+    return profile
+
+
 class VideoRequest(BaseModel):
     video_url: str
     platform: str
@@ -49,6 +63,13 @@ class VideoRequest(BaseModel):
     video_understanding: Optional[bool] = False
     video_interval: Optional[int] = 0
     grid_size: Optional[list] = []
+    transcriber_profile: Optional[str] = None
+    # 不使用模型回复缓存，强制重新生成
+    bypass_llm_cache: Optional[bool] = False
+
+    @field_validator("transcriber_profile")
+    def validate_transcriber_profile(cls, v):
+        return _validate_transcriber_profile(v)
 
     @field_validator("video_url")
     def validate_supported_url(cls, v):
@@ -63,20 +84,57 @@ class VideoRequest(BaseModel):
         return v
 
 
+class BatchVideoRequest(BaseModel):
+    video_urls: List[str]
+    platform: str
+    quality: DownloadQuality
+    screenshot: Optional[bool] = False
+    link: Optional[bool] = False
+    model_name: str
+    provider_id: str
+    format: Optional[list] = []
+    style: str = None
+    extras: Optional[str] = None
+    video_understanding: Optional[bool] = False
+    video_interval: Optional[int] = 0
+    grid_size: Optional[list] = []
+    transcriber_profile: Optional[str] = None
+    # 不使用模型回复缓存，强制重新生成
+    bypass_llm_cache: Optional[bool] = False
+
+    @field_validator("transcriber_profile")
+    def validate_transcriber_profile(cls, v):
+        return _validate_transcriber_profile(v)
+
+    @field_validator("video_urls")
+    def validate_supported_urls(cls, v):
+        if not v:
+            raise ValueError("请至少提供一个视频链接")
+        for url in v:
+            if urlparse(url).scheme in ("http", "https") and not is_supported_batch_url(url):
+                raise NoteError(code=NoteErrorEnum.PLATFORM_NOT_SUPPORTED.code,
+                                message=NoteErrorEnum.PLATFORM_NOT_SUPPORTED.message)
+        return v
+
+
 NOTE_OUTPUT_DIR = os.getenv("NOTE_OUTPUT_DIR", "note_results")
 UPLOAD_DIR = "uploads"
 
 
 def save_note_to_file(task_id: str, note):
     os.makedirs(NOTE_OUTPUT_DIR, exist_ok=True)
+    result = asdict(note)
     with open(os.path.join(NOTE_OUTPUT_DIR, f"{task_id}.json"), "w", encoding="utf-8") as f:
-        json.dump(asdict(note), f, ensure_ascii=False, indent=2)
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    # 同时放入内存，状态查询无需再读取结果文件
+    task_status_registry.set_result(task_id, json.loads(json.dumps(result, ensure_ascii=False)))
 
 
 def run_note_task(task_id: str, video_url: str, platform: str, quality: DownloadQuality,
                   link: bool = False, screenshot: bool = False, model_name: str = None, provider_id: str = None,
                   _format: list = None, style: str = None, extras: str = None, video_understanding: bool = False,
-                  video_interval=0, grid_size=[]
+                  video_interval=0, grid_size=[], transcriber_profile: Optional[str] = None,
+                  bypass_llm_cache: bool = False
                   ):
 
     if not model_name or not provider_id:
@@ -96,21 +154,29 @@ def run_note_task(task_id: str, video_url: str, platform: str, quality: Download
         screenshot=screenshot
         , video_understanding=video_understanding,
         video_interval=video_interval,
-        grid_size=grid_size
+        grid_size=grid_size,
+        transcriber_profile=transcriber_profile,
+        bypass_llm_cache=bypass_llm_cache,
     )
     logger.info(f"Note generated: {task_id}")
     if not note or not note.markdown:
+        # generate() 内部已捕获异常并写入 FAILED 状态，这里抛出让任务队列把任务记为失败
         logger.warning(f"任务 {task_id} 执行失败，跳过保存")
-        return
+        raise RuntimeError(f"笔记生成失败 (task_id={task_id})")
     save_note_to_file(task_id, note)
+    # SUCCESS 状态先于结果文件写入，结果落盘后再通知一次，推送连接据此读取结果
+    task_event_bus.publish(task_id, {"status": TaskStatus.SUCCESS.value, "progress": 100, "result_ready": True})
+
 
+# 持久化任务队列，worker 在应用启动时开启（见 main.py）；转录器预热完成前任务留在队列中
+note_task_queue = NoteTaskQueue(handler=run_note_task, wait_ready=wait_transcriber_ready)
 
 
 @router.post('/delete_task')
 def delete_task(data: RecordRequest):
     try:
 
-        NoteGenerator().delete_note(video_id=data.video_id, platform=data.platform)
+        NoteGenerator.delete_note(video_id=data.video_id, platform=data.platform)
         return R.success(msg='删除成功')
     except Exception as e:
         return R.error(msg=e)
@@ -129,7 +195,7 @@ async def upload(file: UploadFile = File(...)):
 
 
 @router.post("/generate_note")
-def generate_note(data: VideoRequest, background_tasks: BackgroundTasks):
+def generate_note(data: VideoRequest):
     try:
 
         video_id = extract_video_id(data.video_url, data.platform)
@@ -144,81 +210,260 @@ def generate_note(data: VideoRequest, background_tasks: BackgroundTasks):
         if data.task_id:
             # 如果传了task_id，说明是重试！
             task_id = data.task_id
-            # 更新之前的状态
-            NoteGenerator()._update_status(task_id, TaskStatus.PENDING)
+            # 更新之前的状态，并清除上一次的笔记结果
+            task_status_registry.clear_result(task_id)
+            task_status_registry.set(task_id, TaskStatus.PENDING)
             logger.info(f"重试模式，复用已有 task_id={task_id}")
         else:
             # 正常新建任务
             task_id = str(uuid.uuid4())
 
-        background_tasks.add_task(run_note_task, task_id, data.video_url, data.platform, data.quality, data.link,
-                                  data.screenshot, data.model_name, data.provider_id, data.format, data.style,
-                                  data.extras, data.video_understanding, data.video_interval, data.grid_size)
+        queued = note_task_queue.submit(
+            task_id,
+            video_url=data.video_url,
+            platform=data.platform,
+            quality=data.quality.value,
+            link=data.link,
+            screenshot=data.screenshot,
+            model_name=data.model_name,
+            provider_id=data.provider_id,
+            _format=data.format,
+            style=data.style,
+            extras=data.extras,
+            video_understanding=data.video_understanding,
+            video_interval=data.video_interval,
+            grid_size=data.grid_size,
+            transcriber_profile=data.transcriber_profile,
+            bypass_llm_cache=data.bypass_llm_cache,
+        )
+        if not queued:
+            logger.info(f"任务正在执行中，忽略重复提交 task_id={task_id}")
         return R.success({"task_id": task_id})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/task_status/{task_id}")
-def get_task_status(task_id: str):
-    status_path = os.path.join(NOTE_OUTPUT_DIR, f"{task_id}.status.json")
-    result_path = os.path.join(NOTE_OUTPUT_DIR, f"{task_id}.json")
+@router.post("/generate_batch")
+def generate_batch(data: BatchVideoRequest):
+    """
+    批量生成笔记：展开合集/播放列表/多P 链接，按视频 ID 去重后逐个放入任务队列，
+    并发度由任务队列的 worker 数控制
+    """
+    try:
+        downloader = SUPPORT_PLATFORM_MAP.get(data.platform)
+        if downloader is None:
+            raise NoteError(code=NoteErrorEnum.PLATFORM_NOT_SUPPORTED.code,
+                            message=NoteErrorEnum.PLATFORM_NOT_SUPPORTED.message)
+
+        video_urls = []
+        for url in data.video_urls:
+            try:
+                video_urls.extend(downloader.expand(url))
+            except Exception as e:
+                logger.warning(f"链接展开失败，按单个视频处理：{url}，{e}")
+                video_urls.append(url)
+
+        batch_id = str(uuid.uuid4())
+        items, skipped, seen = [], [], set()
+        for url in video_urls:
+            video_id = NoteGenerator._resolve_video_id(url, data.platform)
+            dedupe_key = video_id or url
+            if dedupe_key in seen:
+                skipped.append(url)
+                continue
+            seen.add(dedupe_key)
+
+            task_id = str(uuid.uuid4())
+            note_task_queue.submit(
+                task_id,
+                video_url=url,
+                platform=data.platform,
+                quality=data.quality.value,
+                link=data.link,
+                screenshot=data.screenshot,
+                model_name=data.model_name,
+                provider_id=data.provider_id,
+                _format=data.format,
+                style=data.style,
+                extras=data.extras,
+                video_understanding=data.video_understanding,
+                video_interval=data.video_interval,
+                grid_size=data.grid_size,
+                transcriber_profile=data.transcriber_profile,
+                bypass_llm_cache=data.bypass_llm_cache,
+            )
+            items.append({"task_id": task_id, "video_url": url, "video_id": video_id, "platform": data.platform})
+
+        insert_note_batch(batch_id, items)
+        logger.info(f"批量任务已提交 batch_id={batch_id}，共 {len(items)} 个视频，跳过重复 {len(skipped)} 个")
+        return R.success({"batch_id": batch_id, "items": items, "skipped": skipped})
+    except NoteError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 
-    # 优先读状态文件
-    if os.path.exists(status_path):
-        with open(status_path, "r", encoding="utf-8") as f:
-            status_content = json.load(f)
+def load_task_status(task_id: str) -> dict:
+    """
+    读取任务的当前状态；成功时附带笔记结果
 
+    :param task_id: 任务 ID
+    :return: {"status", "message", "task_id", ["result"], ["partial_markdown"], ["queue_position"]}
+    """
+    # 状态与结果均优先从内存状态表读取，未命中时由状态表回退到磁盘
+    status_content = task_status_registry.get(task_id)
+    if status_content is not None:
         status = status_content.get("status")
         message = status_content.get("message", "")
 
         if status == TaskStatus.SUCCESS.value:
             # 成功状态的话，继续读取最终笔记内容
-            if os.path.exists(result_path):
-                with open(result_path, "r", encoding="utf-8") as rf:
-                    result_content = json.load(rf)
-                return R.success({
+            result_content = task_status_registry.get_result(task_id)
+            if result_content is not None:
+                return {
                     "status": status,
                     "result": result_content,
                     "message": message,
                     "task_id": task_id
-                })
+                }
             else:
                 # 理论上不会出现，保险处理
-                return R.success({
+                return {
                     "status": TaskStatus.PENDING.value,
                     "message": "任务完成，但结果文件未找到",
                     "task_id": task_id
-                })
-
-        if status == TaskStatus.FAILED.value:
-            return R.error(message or "任务失败", code=500)
+                }
 
-        # 处理中状态
-        return R.success({
+        # 处理中/失败状态；总结阶段附带 GPT 已生成的部分 Markdown
+        data = {
             "status": status,
             "message": message,
             "task_id": task_id
-        })
-
-    # 没有状态文件，但有结果
-    if os.path.exists(result_path):
-        with open(result_path, "r", encoding="utf-8") as f:
-            result_content = json.load(f)
-        return R.success({
+        }
+        partial = task_status_registry.get_partial(task_id)
+        if partial is not None:
+            data["partial_markdown"] = partial
+        return data
+
+    # 没有状态，但有结果
+    result_content = task_status_registry.get_result(task_id)
+    if result_content is not None:
+        return {
             "status": TaskStatus.SUCCESS.value,
             "result": result_content,
             "task_id": task_id
-        })
+        }
 
     # 什么都没有，默认PENDING
-    return R.success({
+    return {
         "status": TaskStatus.PENDING.value,
         "message": "任务排队中",
-        "task_id": task_id
+        "task_id": task_id,
+        "queue_position": note_task_queue.position(task_id),
+    }
+
+
+@router.get("/task_status/{task_id}")
+def get_task_status(task_id: str):
+    data = load_task_status(task_id)
+    if data["status"] == TaskStatus.FAILED.value:
+        return R.error(data.get("message") or "任务失败", code=500)
+    return R.success(data)
+
+
+@router.get("/batch_status/{batch_id}")
+def get_batch_status(batch_id: str):
+    items = get_note_batch_items(batch_id)
+    if not items:
+        return R.error("批量任务不存在", code=404)
+
+    counts = {}
+    for item in items:
+        data = load_task_status(item["task_id"])
+        item["status"] = data["status"]
+        item["message"] = data.get("message", "")
+        item["progress"] = TaskStatus.progress(data["status"])
+        counts[data["status"]] = counts.get(data["status"], 0) + 1
+
+    finished = counts.get(TaskStatus.SUCCESS.value, 0) + counts.get(TaskStatus.FAILED.value, 0)
+    return R.success({
+        "batch_id": batch_id,
+        "total": len(items),
+        "finished": finished,
+        "counts": counts,
+        "progress": round(sum(item["progress"] for item in items) / len(items), 1),
+        "items": items,
     })
 
 
+def _sse(data: dict) -> str:
+    return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.get("/task_events/{task_id}")
+async def task_events(task_id: str, request: Request):
+    """
+    以 SSE 推送任务的阶段变化与进度，替代对 /task_status 的轮询。
+    连接建立时先推送一次当前状态（总结阶段含 partial_markdown），之后 GPT 每生成一段文本推送一次 markdown_delta，
+    任务成功（附带结果）或失败后关闭连接。
+    """
+
+    async def event_stream():
+        queue = task_event_bus.subscribe(task_id)
+        try:
+            snapshot = await asyncio.to_thread(load_task_status, task_id)
+            yield _sse(snapshot)
+            if snapshot["status"] in (TaskStatus.SUCCESS.value, TaskStatus.FAILED.value):
+                return
+
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # 心跳，防止代理断开空闲连接
+                    yield ": keep-alive\n\n"
+                    continue
+
+                if event.get("status") == TaskStatus.SUCCESS.value:
+                    # 结果文件可能尚未写入，读不到时继续等待 result_ready 事件
+                    snapshot = await asyncio.to_thread(load_task_status, task_id)
+                    if "result" in snapshot:
+                        yield _sse({**snapshot, "progress": 100})
+                        return
+                    continue
+
+                yield _sse({**event, "task_id": task_id})
+                if event.get("status") == TaskStatus.FAILED.value:
+                    return
+        finally:
+            task_event_bus.unsubscribe(task_id, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # 关闭 nginx 缓冲，保证事件实时送达
+        },
+    )
+
+
+@router.get("/queue_status")
+def get_queue_status():
+    return R.success(note_task_queue.stats())
+
+
+@router.get("/ready")
+def get_ready_status():
+    """就绪检查：转录器预热完成（或失败）前返回 HTTP 503，期间提交的任务会排队等待"""
+    data = {"transcriber": get_warmup_status(), "queue": note_task_queue.stats()}
+    if not data["transcriber"]["ready"]:
+        response = R.error(msg="转录模型加载中", code=503, data=data)
+        response.status_code = 503
+        return response
+    return R.success(data)
+
+
 @router.get("/image_proxy")
 async def image_proxy(request: Request, url: str):
     headers = {
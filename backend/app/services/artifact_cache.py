@@ -0,0 +1,210 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import asdict
+from pathlib import Path
+from typing import Optional
+
+from app.models.audio_model import AudioDownloadResult
+from app.models.transcriber_model import TranscriptResult, TranscriptSegment
+from app.utils.logger import get_logger
+from app.utils.path_helper import get_data_dir
+
+logger = get_logger(__name__)
+
+
+class ArtifactCache:
+    """
+    按内容寻址的下载/转写产物缓存，多个任务共享同一份结果。
+
+    缓存键由 (平台, 视频 ID, 音质) 以及转写器签名组成，与 task_id 无关，
+    因此同一视频被不同用户重复提交、或同一任务重试时都可以直接复用。
+
+    目录布局（按视频 ID 哈希分片，避免单目录文件过多）：
+        {root}/{platform}/{shard}/{video_id}/
+            audio_{quality}.json
+            transcript_{quality}_{transcriber_signature}.json
+            {video_id}.mp3 / {video_id}.mp4 ...   # 下载的媒体文件
+        {root}/_by_hash/{shard}/
+            {audio_sha256}_{transcriber_signature}.json   # 按音频内容索引的转写结果
+
+    按音频内容哈希索引的转写缓存与平台、视频 ID 无关：同一段音频换个文件名重新上传，
+    或从不同平台下载到完全相同的音频文件时，也能跳过转写。
+    """
+
+    HASH_CHUNK_SIZE = 1024 * 1024
+    # 指纹缓存条数上限，超出时淘汰最久未使用的条目
+    MAX_FINGERPRINTS = 1024
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root or os.getenv("ARTIFACT_DIR") or os.path.join(get_data_dir(), "artifacts"))
+        self.root.mkdir(parents=True, exist_ok=True)
+        # 文件指纹缓存（LRU）：(路径, 大小, 修改时间) -> sha256，避免重复计算
+        self._fingerprints: "OrderedDict[tuple, str]" = OrderedDict()
+        self._fingerprint_lock = threading.Lock()
+
+    # ---------------- 路径 ----------------
+
+    @staticmethod
+    def _safe_name(value: str) -> str:
+        return "".join(c if c.isalnum() or c in "-_." else "_" for c in str(value))
+
+    @staticmethod
+    def _shard(value: str) -> str:
+        return hashlib.sha1(str(value).encode("utf-8")).hexdigest()[:2]
+
+    def entry_dir(self, platform: str, video_id: str) -> Path:
+        """
+        返回某个视频的分片缓存目录（不存在则创建），下载器也可以把媒体文件直接写入这里
+
+        :param platform: 平台标识
+        :param video_id: 视频 ID
+        :return: 目录路径
+        """
+        path = self.root / self._safe_name(platform) / self._shard(video_id) / self._safe_name(video_id)
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def _audio_file(self, platform: str, video_id: str, quality: str) -> Path:
+        return self.entry_dir(platform, video_id) / f"audio_{self._safe_name(quality)}.json"
+
+    def _transcript_file(self, platform: str, video_id: str, quality: str, signature: str) -> Path:
+        name = f"transcript_{self._safe_name(quality)}_{self._safe_name(signature)}.json"
+        return self.entry_dir(platform, video_id) / name
+
+    def _hash_transcript_file(self, audio_hash: str, signature: str) -> Path:
+        path = self.root / "_by_hash" / audio_hash[:2]
+        path.mkdir(parents=True, exist_ok=True)
+        return path / f"{audio_hash}_{self._safe_name(signature)}.json"
+
+    # ---------------- 指纹 ----------------
+
+    def fingerprint(self, file_path: str) -> Optional[str]:
+        """
+        计算音频文件内容的 sha256（分块流式读取，不会整体载入内存）
+
+        :param file_path: 音频文件路径
+        :return: 十六进制哈希；文件不存在时返回 None
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+        with self._fingerprint_lock:
+            if key in self._fingerprints:
+                self._fingerprints.move_to_end(key)
+                return self._fingerprints[key]
+
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(self.HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        audio_hash = digest.hexdigest()
+        with self._fingerprint_lock:
+            self._fingerprints[key] = audio_hash
+            self._fingerprints.move_to_end(key)
+            while len(self._fingerprints) > self.MAX_FINGERPRINTS:
+                self._fingerprints.popitem(last=False)
+        return audio_hash
+
+    # ---------------- 读写 ----------------
+
+    @staticmethod
+    def _read_json(path: Path) -> Optional[dict]:
+        if not path.exists():
+            return None
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except Exception as e:
+            logger.warning(f"读取缓存失败，将忽略该缓存 ({path})：{e}")
+            return None
+
+    @staticmethod
+    def _write_json(path: Path, data: dict) -> None:
+        # 先写临时文件再原子替换，避免并发任务读到写了一半的内容；临时文件名唯一，同一进程内的多个线程互不覆盖
+        fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f"{path.stem}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(temp_name, path)
+        except BaseException:
+            if os.path.exists(temp_name):
+                os.remove(temp_name)
+            raise
+
+    def load_audio(self, platform: str, video_id: str, quality: str) -> Optional[AudioDownloadResult]:
+        """
+        读取音频下载结果缓存；若缓存记录的音频文件已被清理，视为未命中
+
+        :return: AudioDownloadResult 或 None
+        """
+        data = self._read_json(self._audio_file(platform, video_id, quality))
+        if not data:
+            return None
+        if not data.get("file_path") or not os.path.exists(data["file_path"]):
+            logger.info(f"音频缓存对应的文件已不存在，忽略缓存 (video_id={video_id})")
+            return None
+        try:
+            return AudioDownloadResult(**data)
+        except Exception as e:
+            logger.warning(f"解析音频缓存失败：{e}")
+            return None
+
+    def save_audio(self, platform: str, video_id: str, quality: str, audio: AudioDownloadResult) -> None:
+        try:
+            self._write_json(self._audio_file(platform, video_id, quality), asdict(audio))
+        except Exception as e:
+            logger.warning(f"写入音频缓存失败 (video_id={video_id})：{e}")
+
+    def load_transcript(self, platform: str, video_id: str, quality: str, signature: str) -> Optional[TranscriptResult]:
+        """
+        读取转写结果缓存
+
+        :param signature: 转写器签名（类型 + 模型），不同转写器的结果互不复用
+        :return: TranscriptResult 或 None
+        """
+        return self._load_transcript_file(self._transcript_file(platform, video_id, quality, signature))
+
+    def save_transcript(self, platform: str, video_id: str, quality: str, signature: str,
+                        transcript: TranscriptResult) -> None:
+        self._save_transcript_file(self._transcript_file(platform, video_id, quality, signature), transcript)
+
+    def load_transcript_by_hash(self, audio_hash: str, signature: str) -> Optional[TranscriptResult]:
+        """
+        按音频内容哈希读取转写结果缓存
+
+        :param audio_hash: fingerprint() 计算出的音频哈希
+        :param signature: 转写器签名（类型 + 模型）
+        :return: TranscriptResult 或 None
+        """
+        return self._load_transcript_file(self._hash_transcript_file(audio_hash, signature))
+
+    def save_transcript_by_hash(self, audio_hash: str, signature: str, transcript: TranscriptResult) -> None:
+        self._save_transcript_file(self._hash_transcript_file(audio_hash, signature), transcript)
+
+    def _load_transcript_file(self, path: Path) -> Optional[TranscriptResult]:
+        data = self._read_json(path)
+        if not data:
+            return None
+        try:
+            segments = [TranscriptSegment(**seg) for seg in data.get("segments", [])]
+            return TranscriptResult(language=data.get("language"), full_text=data["full_text"], segments=segments)
+        except Exception as e:
+            logger.warning(f"解析转写缓存失败：{e}")
+            return None
+
+    def _save_transcript_file(self, path: Path, transcript: TranscriptResult) -> None:
+        try:
+            data = asdict(transcript)
+            # raw 为各转写器的原始响应，体积大且不一定可序列化，不写入共享缓存
+            data.pop("raw", None)
+            self._write_json(path, data)
+        except Exception as e:
+            logger.warning(f"写入转写缓存失败 ({path.name})：{e}")
+
+
+artifact_cache = ArtifactCache()
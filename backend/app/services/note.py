@@ -2,9 +2,9 @@ import json
 import logging
 import os
 import re
-from dataclasses import asdict
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional, Tuple, Union, Any
+from typing import Any, Callable, List, Optional, Tuple, Union
 
 from fastapi import HTTPException
 from pydantic import HttpUrl
@@ -28,12 +28,19 @@ from app.models.gpt_model import GPTSource
 from app.models.model_config import ModelConfig
 from app.models.notes_model import AudioDownloadResult, NoteResult
 from app.models.transcriber_model import TranscriptResult, TranscriptSegment
+from app.services.artifact_cache import artifact_cache
 from app.services.constant import SUPPORT_PLATFORM_MAP
 from app.services.provider import ProviderService
+from app.services.streaming_summary import STREAMING_SUMMARY_ENABLED, StreamingSummarizer
+from app.services.task_status_registry import task_status_registry
 from app.transcriber.base import Transcriber
 from app.transcriber.transcriber_provider import get_transcriber, _transcribers
 from app.utils.note_helper import replace_content_markers
+from app.utils.audio_normalizer import normalize_audio
+from app.utils.path_helper import get_app_dir, get_data_dir
+from app.utils.single_flight import SingleFlight
 from app.utils.status_code import StatusCode
+from app.utils.url_parser import extract_video_id
 from app.utils.video_helper import generate_screenshot
 from app.utils.video_reader import VideoReader
 
@@ -50,6 +57,11 @@ BACKEND_BASE_URL = f"{API_BASE_URL}:{BACKEND_PORT}"
 # 输出目录（用于缓存音频、转写、Markdown 文件，以及存储截图）
 NOTE_OUTPUT_DIR = Path(os.getenv("NOTE_OUTPUT_DIR", "note_results"))
 NOTE_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+# 本地上传文件的平台标识，其 video_id 取自文件名，不能作为产物缓存键
+LOCAL_PLATFORM = "local"
+# 同一视频的并发任务共享下载与转写：后到的任务挂到进行中的阶段上等待结果，只各自执行 GPT 总结
+_media_flight = SingleFlight()
 IMAGE_OUTPUT_DIR = os.getenv("OUT_DIR", "images")
 # 图片基础 URL（用于生成 Markdown 中的图片链接，需前端静态目录对应）
 IMAGE_BASE_URL = os.getenv("IMAGE_BASE_URL", "/static/screenshots")
@@ -69,7 +81,8 @@ class NoteGenerator:
         self.model_size: str = "base"
         self.device: Optional[str] = None
         self.transcriber_type: str = os.getenv("TRANSCRIBER_TYPE", "fast-whisper")
-        self.transcriber: Transcriber = self._init_transcriber()
+        # 转写器在 generate() 中才创建：预热期间 get_transcriber 会阻塞，删除记录等操作不应等待模型加载
+        self.transcriber: Optional[Transcriber] = None
         self.video_path: Optional[Path] = None
         self.video_img_urls=[]
         logger.info("NoteGenerator 初始化完成")
@@ -94,6 +107,8 @@ class NoteGenerator:
         video_understanding: bool = False,
         video_interval: int = 0,
         grid_size: Optional[List[int]] = None,
+        transcriber_profile: Optional[str] = None,
+        bypass_llm_cache: bool = False,
     ) -> NoteResult | None:
         """
         主流程：按步骤依次下载、转写、GPT 总结、截图/链接处理、存库、返回 NoteResult。
@@ -113,10 +128,13 @@ class NoteGenerator:
         :param video_understanding: 是否需要视频拼图理解（生成缩略图）
         :param video_interval: 视频帧截取间隔（秒），仅在 video_understanding 为 True 时生效
         :param grid_size: 生成缩略图时的网格大小，如 [3, 3]
+        :param transcriber_profile: fast-whisper 推理参数预设（fast / balanced / accurate），为空时使用默认预设
+        :param bypass_llm_cache: 为 True 时不使用模型回复缓存，强制重新请求模型
         :return: NoteResult 对象，包含 markdown 文本、转写结果和音频元信息
         """
         if grid_size is None:
             grid_size = []
+        summarizer: Optional[StreamingSummarizer] = None
 
         try:
             logger.info(f"开始生成笔记 (task_id={task_id})")
@@ -125,40 +143,95 @@ class NoteGenerator:
             # 获取下载器与 GPT 实例
 
             downloader = self._get_downloader(platform)
-            gpt = self._get_gpt(model_name, provider_id)
+            gpt = self._get_gpt(model_name, provider_id, use_cache=not bypass_llm_cache)
+            self.transcriber = self._init_transcriber(profile=transcriber_profile)
 
-            # 缓存文件路径
-            audio_cache_file = NOTE_OUTPUT_DIR / f"{task_id}_audio.json"
-            transcript_cache_file = NOTE_OUTPUT_DIR / f"{task_id}_transcript.json"
+            # 下载/转写产物按视频内容缓存（见 ArtifactCache），Markdown 与风格相关仍按任务缓存
+            video_id = self._resolve_video_id(video_url, platform)
             markdown_cache_file = NOTE_OUTPUT_DIR / f"{task_id}_markdown.md"
-            print(audio_cache_file)
-            # 1. 下载音频/视频
-            audio_meta = self._download_media(
-                downloader=downloader,
-                video_url=video_url,
-                quality=quality,
-                audio_cache_file=audio_cache_file,
-                status_phase=TaskStatus.DOWNLOADING,
-                platform=platform,
-                output_path=output_path,
-                screenshot=screenshot,
-                video_understanding=video_understanding,
-                video_interval=video_interval,
-                grid_size=grid_size,
-            )
 
-            # 2. 转写文字
-            transcript = self._transcribe_audio(
-                audio_file=audio_meta.file_path,
-                transcript_cache_file=transcript_cache_file,
-                status_phase=TaskStatus.TRANSCRIBING,
-            )
+            # 未指定输出目录时，媒体文件直接落在该视频的分片缓存目录下
+            if output_path is None and video_id:
+                output_path = str(artifact_cache.entry_dir(platform, video_id))
+
+            # 视频分支（下载视频、截帧拼图）与音频分支（下载音频、转写）互不依赖，
+            # 并行执行，在 GPT 总结前汇合
+            need_video = screenshot or video_understanding
+            video_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="note-video")
+            video_future: Optional[Future] = None
+            try:
+                if need_video:
+                    video_kwargs = dict(
+                        downloader=downloader,
+                        video_url=video_url,
+                        task_id=task_id,
+                        video_id=video_id,
+                        platform=platform,
+                        output_path=output_path,
+                        video_interval=video_interval,
+                        grid_size=grid_size,
+                    )
+                    if downloader.parallel_video_download:
+                        # 并行下载时视频使用单独的子目录：两边的 yt-dlp 都以 %(id)s.%(ext)s 命名，
+                        # 音频回退到 best 格式时会生成同名的 {id}.mp4 并在提取 mp3 后删除，与视频文件冲突
+                        video_kwargs["output_path"] = os.path.join(output_path or get_data_dir(), "video")
+                        video_future = video_executor.submit(self._prepare_video, **video_kwargs)
+                    else:
+                        self._prepare_video(**video_kwargs)
+
+                # 1. 下载音频
+                audio_meta = self._download_media(
+                    downloader=downloader,
+                    video_url=video_url,
+                    quality=quality,
+                    task_id=task_id,
+                    video_id=video_id,
+                    status_phase=TaskStatus.DOWNLOADING,
+                    platform=platform,
+                    output_path=output_path,
+                    need_video=need_video,
+                )
+
+                # 视频分支已经失败时直接结束，不再进行耗时的转写
+                if video_future is not None and video_future.done():
+                    video_future.result()
+
+                # 2. 转写文字（流式总结模式下，转写的同时按时间窗口做分段总结）
+                if STREAMING_SUMMARY_ENABLED:
+                    summarizer = StreamingSummarizer(
+                        gpt=gpt,
+                        source=GPTSource(
+                            title=audio_meta.title,
+                            segment=[],
+                            tags=audio_meta.raw_info.get("tags", []),
+                        ),
+                    )
+                transcript = self._transcribe_audio(
+                    audio_meta=audio_meta,
+                    quality=quality,
+                    task_id=task_id,
+                    video_id=video_id,
+                    status_phase=TaskStatus.TRANSCRIBING,
+                    on_segment=summarizer.feed if summarizer else None,
+                )
+
+                # 等待视频分支完成
+                if video_future is not None:
+                    video_future.result()
+            except Exception:
+                # 任一分支失败：取消尚未开始的视频分支，并等待进行中的视频分支结束，避免任务失败后仍在后台下载；
+                # 失败状态在汇合后由下方的异常处理统一写入一次
+                video_executor.shutdown(wait=True, cancel_futures=True)
+                raise
+            finally:
+                video_executor.shutdown(wait=False)
 
             # 3. GPT 总结
             markdown = self._summarize_text(
                 audio_meta=audio_meta,
                 transcript=transcript,
                 gpt=gpt,
+                task_id=task_id,
                 markdown_cache_file=markdown_cache_file,
                 link=link,
                 screenshot=screenshot,
@@ -166,6 +239,7 @@ class NoteGenerator:
                 style=style,
                 extras=extras,
                 video_img_urls=self.video_img_urls,
+                summarizer=summarizer,
             )
 
             # 4. 截图 & 链接替换
@@ -188,8 +262,10 @@ class NoteGenerator:
             return NoteResult(markdown=markdown, transcript=transcript, audio_meta=audio_meta)
 
         except Exception as exc:
+            if summarizer:
+                summarizer.cancel()
             logger.error(f"生成笔记流程异常 (task_id={task_id})：{exc}", exc_info=True)
-            self._update_status(task_id, TaskStatus.FAILED, message=str(exc))
+            self._update_status(task_id, TaskStatus.FAILED, message=self._error_message(exc))
             return None
 
     @staticmethod
@@ -206,22 +282,25 @@ class NoteGenerator:
 
     # ---------------- 私有方法 ----------------
 
-    def _init_transcriber(self) -> Transcriber:
+    def _init_transcriber(self, profile: Optional[str] = None) -> Transcriber:
         """
         根据环境变量 TRANSCRIBER_TYPE 动态获取并实例化转写器
+
+        :param profile: fast-whisper 推理参数预设，其他转写器忽略
         """
         if self.transcriber_type not in _transcribers:
             logger.error(f"未找到支持的转写器：{self.transcriber_type}")
             raise Exception(f"不支持的转写器：{self.transcriber_type}")
 
         logger.info(f"使用转写器：{self.transcriber_type}")
-        return get_transcriber(transcriber_type=self.transcriber_type)
+        return get_transcriber(transcriber_type=self.transcriber_type, profile=profile)
 
-    def _get_gpt(self, model_name: Optional[str], provider_id: Optional[str]) -> GPT:
+    def _get_gpt(self, model_name: Optional[str], provider_id: Optional[str], use_cache: bool = True) -> GPT:
         """
         根据 provider_id 获取对应的 GPT 实例
         :param model_name: GPT 模型名称
         :param provider_id: 供应商 ID
+        :param use_cache: 是否读取模型回复缓存
         :return: GPT 实例
         """
         provider = ProviderService.get_provider_by_id(provider_id)
@@ -236,7 +315,7 @@ class NoteGenerator:
             provider=provider["type"],
             name=provider["name"],
         )
-        return GPTFactory().from_config(config)
+        return GPTFactory().from_config(config, use_cache=use_cache)
 
     def _get_downloader(self, platform: str) -> Downloader:
         """
@@ -261,9 +340,34 @@ class NoteGenerator:
         logger.info(f"使用下载器：{downloader_cls.__class__}")
         return instance
 
+    @staticmethod
+    def _resolve_video_id(video_url: Union[str, HttpUrl], platform: str) -> Optional[str]:
+        """
+        在下载前从链接中解析视频 ID，用于查询产物缓存；无法解析时返回 None，
+        此时以下载结果中的 video_id 作为缓存键。
+
+        :param video_url: 视频链接
+        :param platform: 平台标识
+        :return: 视频 ID 或 None
+        """
+        try:
+            video_id = extract_video_id(str(video_url), platform)
+        except Exception:
+            return None
+        if video_id and platform == "bilibili":
+            # 多 P 视频共享同一个 BV 号，与 yt-dlp 保持一致用 _p{n} 区分分 P
+            match = re.search(r"[?&]p=(\d+)", str(video_url))
+            if match and int(match.group(1)) > 1:
+                video_id = f"{video_id}_p{match.group(1)}"
+        return video_id
+
+    @staticmethod
+    def _quality_key(quality: Union[str, DownloadQuality]) -> str:
+        return quality.value if isinstance(quality, DownloadQuality) else str(quality)
+
     def _update_status(self, task_id: Optional[str], status: Union[str, TaskStatus], message: Optional[str] = None):
         """
-        创建或更新 {task_id}.status.json，记录当前任务状态
+        更新任务状态：写入内存状态表并推送进度事件，状态文件由状态表在后台批量落盘
 
         :param task_id: 任务唯一 ID
         :param status: TaskStatus 枚举或自定义状态字符串
@@ -271,118 +375,121 @@ class NoteGenerator:
         """
         if not task_id:
             return
-
-        NOTE_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-        status_file = NOTE_OUTPUT_DIR / f"{task_id}.status.json"
-        print(f"写入状态文件: {status_file} 当前状态: {status}")
-        data = {"status": status.value if isinstance(status, TaskStatus) else status}
-        if message:
-            data["message"] = message
-
-        try:
-            # First create a temporary file
-            temp_file = status_file.with_suffix('.tmp')
-
-            # Write to temporary file
-            with temp_file.open('w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-
-            # Atomic rename operation
-            temp_file.replace(status_file)
-
-            print(f"状态文件写入成功: {status_file}")
-        except Exception as e:
-            logger.error(f"写入状态文件失败 (task_id={task_id})：{e}")
-            # Try to write error to file directly as fallback
-            try:
-                with status_file.open('w', encoding='utf-8') as f:
-                    f.write(f"Error writing status: {str(e)}")
-            except:
-                logger.error(f"写入错误  {e}")
+        logger.info(f"任务状态更新 (task_id={task_id})：{status.value if isinstance(status, TaskStatus) else status}")
+        task_status_registry.set(task_id, status, message=message)
 
     def _handle_exception(self, task_id, exc):
         logger.error(f"任务异常 (task_id={task_id})", exc_info=True)
+        self._update_status(task_id, TaskStatus.FAILED, message=self._error_message(exc))
+
+    @staticmethod
+    def _error_message(exc: Exception) -> str:
         error_message = getattr(exc, 'detail', str(exc))
         if isinstance(error_message, dict):
             try:
                 error_message = json.dumps(error_message, ensure_ascii=False)
             except:
                 error_message = str(error_message)
-        self._update_status(task_id, TaskStatus.FAILED, message=error_message)
+        return error_message
+
+    def _prepare_video(
+        self,
+        downloader: Downloader,
+        video_url: Union[str, HttpUrl],
+        task_id: Optional[str],
+        video_id: Optional[str],
+        platform: str,
+        output_path: Optional[str],
+        video_interval: int,
+        grid_size: List[int],
+    ) -> None:
+        """
+        视频分支：下载视频，并在指定 grid_size 时生成缩略图网格，结果写入
+        self.video_path 与 self.video_img_urls。
+
+        :param downloader: Downloader 实例
+        :param video_url: 视频链接
+        :param task_id: 任务 ID，帧图片按任务隔离，避免并发任务互相清理
+        :param video_id: 下载前解析出的视频 ID（可为 None），用于合并同一视频的并发下载
+        :param platform: 平台标识
+        :param output_path: 下载输出目录（可为 None）
+        :param video_interval: 视频截帧间隔
+        :param grid_size: 缩略图网格尺寸
+        """
+        try:
+            logger.info("开始下载视频")
+            if video_id:
+                # 同一视频同时只下载一次
+                video_path_str, shared = _media_flight.do(
+                    ("video", platform, video_id),
+                    downloader.download_video, video_url, output_path,
+                )
+                if shared:
+                    logger.info(f"复用进行中任务的视频下载结果 (video_id={video_id})")
+            else:
+                video_path_str = downloader.download_video(video_url, output_path)
+            self.video_path = Path(video_path_str)
+            logger.info(f"视频下载完成：{self.video_path}")
+
+            # 若指定了 grid_size，则生成缩略图
+            if grid_size:
+                self.video_img_urls = VideoReader(
+                    video_path=str(self.video_path),
+                    grid_size=tuple(grid_size),
+                    frame_interval=video_interval,
+                    unit_width=1280,
+                    unit_height=720,
+                    save_quality=90,
+                    frame_dir=get_app_dir(os.path.join("output_frames", task_id or "default")),
+                    grid_dir=get_app_dir(os.path.join("grid_output", task_id or "default")),
+                ).run()
+            else:
+                logger.info("未指定 grid_size，跳过缩略图生成")
+        except Exception as exc:
+            # 并行执行时音频分支仍在更新状态，这里只抛出，由 generate() 汇合后统一标记失败
+            logger.error(f"视频下载失败：{exc}")
+            raise
 
     def _download_media(
         self,
         downloader: Downloader,
         video_url: Union[str, HttpUrl],
         quality: DownloadQuality,
-        audio_cache_file: Path,
+        task_id: Optional[str],
+        video_id: Optional[str],
         status_phase: TaskStatus,
         platform: str,
         output_path: Optional[str],
-        screenshot: bool,
-        video_understanding: bool,
-        video_interval: int,
-        grid_size: List[int],
+        need_video: bool,
     ) -> AudioDownloadResult | None:
         """
-        1. 检查音频缓存；若不存在，则根据需要下载音频或视频（若需截图/可视化）。
-        2. 如果需要视频，则先下载视频并生成缩略图集，再下载音频。
-        3. 返回 AudioDownloadResult
+        1. 检查产物缓存；若不存在，则下载音频。同一视频正在下载时，直接等待并复用其结果。
+        2. 返回 AudioDownloadResult
+
+        视频下载与缩略图生成由 _prepare_video 在并行分支中完成。
 
         :param downloader: Downloader 实例
         :param video_url: 视频/音频链接
         :param quality: 音频下载质量
-        :param audio_cache_file: 本地缓存 JSON 文件路径
+        :param task_id: 任务 ID，用于更新状态
+        :param video_id: 下载前解析出的视频 ID（可为 None），作为产物缓存键
         :param status_phase: 对应的状态枚举，如 TaskStatus.DOWNLOADING
         :param platform: 平台标识
         :param output_path: 下载输出目录（可为 None）
-        :param screenshot: 是否需要在笔记中插入截图
-        :param video_understanding: 是否需要生成缩略图
-        :param video_interval: 视频截帧间隔
-        :param grid_size: 缩略图网格尺寸
+        :param need_video: 本次任务是否同时需要视频（透传给下载器）
         :return: AudioDownloadResult 对象
         """
-        task_id = audio_cache_file.stem.split("_")[0]
         self._update_status(task_id, status_phase)
-
-
-
-        # 判断是否需要下载视频
-        need_video = screenshot or video_understanding
-        if need_video:
-            try:
-                logger.info("开始下载视频")
-                video_path_str = downloader.download_video(video_url)
-                self.video_path = Path(video_path_str)
-                logger.info(f"视频下载完成：{self.video_path}")
-
-                # 若指定了 grid_size，则生成缩略图
-                if grid_size:
-                    self.video_img_urls=VideoReader(
-                        video_path=str(self.video_path),
-                        grid_size=tuple(grid_size),
-                        frame_interval=video_interval,
-                        unit_width=1280,
-                        unit_height=720,
-                        save_quality=90,
-                    ).run()
-                else:
-                    logger.info("未指定 grid_size，跳过缩略图生成")
-            except Exception as exc:
-                logger.error(f"视频下载失败：{exc}")
-
-                self._handle_exception(task_id, exc)
-                raise
-        # 已有缓存，尝试加载
-        if audio_cache_file.exists():
-            logger.info(f"检测到音频缓存 ({audio_cache_file})，直接读取")
-            try:
-                data = json.loads(audio_cache_file.read_text(encoding="utf-8"))
-                return AudioDownloadResult(**data)
-            except Exception as e:
-                logger.warning(f"读取音频缓存失败，将重新下载：{e}")
-        # 下载音频
-        try:
+        quality_key = self._quality_key(quality)
+
+        def load_or_download() -> AudioDownloadResult:
+            # 已有缓存，直接复用
+            if video_id:
+                cached = artifact_cache.load_audio(platform, video_id, quality_key)
+                if cached:
+                    logger.info(f"命中音频产物缓存 (platform={platform}, video_id={video_id}, quality={quality_key})")
+                    return cached
+            # 下载音频
             logger.info("开始下载音频")
             audio = downloader.download(
                 video_url=video_url,
@@ -390,54 +497,114 @@ class NoteGenerator:
                 output_dir=output_path,
                 need_video=need_video,
             )
-            # 缓存 audio 元信息到本地 JSON
-            audio_cache_file.write_text(json.dumps(asdict(audio), ensure_ascii=False, indent=2), encoding="utf-8")
-            logger.info(f"音频下载并缓存成功 ({audio_cache_file})")
+            # 缓存 audio 元信息，供后续任务与重试复用；本地文件以文件名作为 video_id，不按 ID 缓存
+            if platform != LOCAL_PLATFORM:
+                artifact_cache.save_audio(platform, video_id or audio.video_id, quality_key, audio)
+                logger.info(f"音频下载并缓存成功 (video_id={video_id or audio.video_id})")
+            return audio
+
+        try:
+            if not video_id:
+                return load_or_download()
+            audio, shared = _media_flight.do(("audio", platform, video_id, quality_key), load_or_download)
+            if shared:
+                logger.info(f"复用进行中任务的音频下载结果 (task_id={task_id}, video_id={video_id})")
             return audio
         except Exception as exc:
+            # 视频分支可能仍在并行执行，失败状态由 generate() 在两个分支汇合后统一写入
             logger.error(f"音频下载失败：{exc}")
-            self._handle_exception(task_id, exc)
             raise
 
 
     def _transcribe_audio(
         self,
-        audio_file: str,
-        transcript_cache_file: Path,
+        audio_meta: AudioDownloadResult,
+        quality: DownloadQuality,
+        task_id: Optional[str],
+        video_id: Optional[str],
         status_phase: TaskStatus,
+        on_segment: Optional[Callable[[TranscriptSegment], None]] = None,
     ) -> TranscriptResult | None:
         """
-        1. 检查转写缓存；若存在则尝试加载，否则调用转写器生成并缓存。
+        1. 依次按视频 ID、音频内容哈希检查转写产物缓存；若存在则直接加载，否则调用转写器生成并缓存。
+           本地上传的文件只按音频内容哈希缓存。同一视频正在转写时，直接等待并复用其结果。
         2. 返回 TranscriptResult 对象
 
-        :param audio_file: 音频文件本地路径
-        :param transcript_cache_file: 转写结果缓存路径
+        :param audio_meta: 音频下载结果
+        :param quality: 音频下载质量，参与缓存键
+        :param task_id: 任务 ID，用于更新状态
+        :param video_id: 下载前解析出的视频 ID（可为 None），与下载阶段使用相同的缓存键
         :param status_phase: 对应的状态枚举，如 TaskStatus.TRANSCRIBING
+        :param on_segment: 可选的片段回调，转写器每产出一个片段（或命中缓存时逐个）调用一次
         :return: TranscriptResult 对象
         """
-        task_id = transcript_cache_file.stem.split("_")[0]
         self._update_status(task_id, status_phase)
+        signature = self.transcriber.cache_signature()
+        media_id = video_id or audio_meta.video_id
+        if audio_meta.platform == LOCAL_PLATFORM:
+            # 本地上传以文件名作为 video_id，而 /upload 会覆盖同名文件，按 ID 缓存会把旧录音的
+            # 转写结果返回给新文件。因此本地文件不使用 ID 缓存，先计算音频内容哈希，
+            # 缓存查询与并发合并都以哈希为键
+            cache_key = None
+            local_audio_path = normalize_audio(audio_meta.file_path, self.transcriber.preferred_audio_format)
+            local_audio_hash = artifact_cache.fingerprint(local_audio_path)
+            flight_key = ("transcript", "_by_hash", local_audio_hash or local_audio_path, signature)
+        else:
+            cache_key = (audio_meta.platform, media_id, self._quality_key(quality), signature)
+            local_audio_path = local_audio_hash = None
+            flight_key = ("transcript",) + cache_key
+
+        def load_or_transcribe() -> Tuple[TranscriptResult, bool]:
+            # 已有缓存，直接复用
+            if cache_key:
+                cached = artifact_cache.load_transcript(*cache_key)
+                if cached:
+                    logger.info(f"命中转写产物缓存 (video_id={media_id}, transcriber={signature})")
+                    return cached, False
+
+            if local_audio_path:
+                audio_path, audio_hash = local_audio_path, local_audio_hash
+            else:
+                # 转换为转写器偏好的格式（16kHz 单声道），转换结果保留在源文件旁复用
+                audio_path = normalize_audio(audio_meta.file_path, self.transcriber.preferred_audio_format)
+                audio_hash = artifact_cache.fingerprint(audio_path)
+
+            # 按音频内容再查一次：同一音频换名上传或来自其他平台时同样命中
+            if audio_hash:
+                cached = artifact_cache.load_transcript_by_hash(audio_hash, signature)
+                if cached:
+                    logger.info(f"命中音频内容转写缓存 (sha256={audio_hash[:12]}, transcriber={signature})")
+                    if cache_key:
+                        artifact_cache.save_transcript(*cache_key, cached)
+                    return cached, False
+
+            # 调用转写器；平台元数据提供了语言时直接告知转写器，省去语言检测
+            logger.info("开始转写音频")
+            language = (audio_meta.raw_info or {}).get("language")
+            kwargs = {"language": language} if language and self.transcriber.supports_language_hint else {}
+            if on_segment:
+                result = self.transcriber.transcript_stream(file_path=audio_path, on_segment=on_segment, **kwargs)
+            else:
+                result = self.transcriber.transcript(file_path=audio_path, **kwargs)
+            if cache_key:
+                artifact_cache.save_transcript(*cache_key, result)
+            if audio_hash:
+                artifact_cache.save_transcript_by_hash(audio_hash, signature, result)
+            logger.info(f"转写并缓存成功 (video_id={media_id})")
+            return result, True
 
-        # 已有缓存，尝试加载
-        if transcript_cache_file.exists():
-            logger.info(f"检测到转写缓存 ({transcript_cache_file})，尝试读取")
-            try:
-                data = json.loads(transcript_cache_file.read_text(encoding="utf-8"))
-                segments = [TranscriptSegment(**seg) for seg in data.get("segments", [])]
-                return TranscriptResult(language=data["language"], full_text=data["full_text"], segments=segments)
-            except Exception as e:
-                logger.warning(f"加载转写缓存失败，将重新转写：{e}")
-
-        # 调用转写器
         try:
-            logger.info("开始转写音频")
-            transcript = self.transcriber.transcript(file_path=audio_file)
-            transcript_cache_file.write_text(json.dumps(asdict(transcript), ensure_ascii=False, indent=2), encoding="utf-8")
-            logger.info(f"转写并缓存成功 ({transcript_cache_file})")
+            (transcript, streamed), shared = _media_flight.do(flight_key, load_or_transcribe)
+            if shared:
+                logger.info(f"复用进行中任务的转写结果 (task_id={task_id}, video_id={media_id})")
+            # 片段回调只在本任务亲自转写时被调用过，其余情况（缓存命中、复用结果）补发一遍
+            if on_segment and (shared or not streamed):
+                for segment in transcript.segments:
+                    on_segment(segment)
             return transcript
         except Exception as exc:
+            # 视频分支可能仍在并行执行，失败状态由 generate() 在两个分支汇合后统一写入
             logger.error(f"音频转写失败：{exc}")
-            self._handle_exception(task_id, exc)
             raise
 
     def _summarize_text(
@@ -445,13 +612,15 @@ class NoteGenerator:
         audio_meta: AudioDownloadResult,
         transcript: TranscriptResult,
         gpt: GPT,
+        task_id: Optional[str],
         markdown_cache_file: Path,
         link: bool,
         screenshot: bool,
         formats: List[str],
         style: Optional[str],
         extras: Optional[str],
-            video_img_urls: List[str],
+        video_img_urls: List[str],
+        summarizer: Optional[StreamingSummarizer] = None,
     ) -> str | None:
         """
         调用 GPT 对转写结果进行总结，生成 Markdown 文本并缓存。
@@ -459,15 +628,17 @@ class NoteGenerator:
         :param audio_meta: AudioDownloadResult 元信息
         :param transcript: TranscriptResult 转写结果
         :param gpt: GPT 实例
+        :param task_id: 任务 ID，用于更新状态
         :param markdown_cache_file: Markdown 缓存路径
         :param link: 是否在笔记中插入链接
         :param screenshot: 是否在笔记中生成截图占位
         :param formats: 包含 'link' 或 'screenshot' 的列表
         :param style: GPT 输出风格
         :param extras: GPT 额外参数
+        :param video_img_urls: 视频缩略图网格（base64 data url）
+        :param summarizer: 流式总结器；提供时等待其分段总结完成后做合并总结
         :return: 生成的 Markdown 字符串
         """
-        task_id = markdown_cache_file.stem
         self._update_status(task_id, TaskStatus.SUMMARIZING)
 
         source = GPTSource(
@@ -483,7 +654,14 @@ class NoteGenerator:
         )
 
         try:
-            markdown = gpt.summarize(source)
+            # 最终总结流式生成，已生成的部分可通过任务状态/事件接口读取
+            on_token = (lambda delta: task_status_registry.append_partial(task_id, delta)) if task_id else None
+            partials = summarizer.finish() if summarizer else None
+            if partials:
+                logger.info(f"合并 {len(partials)} 段分段总结")
+                markdown = gpt.merge_partials(source, partials, on_token=on_token)
+            else:
+                markdown = gpt.summarize(source, on_token=on_token)
             markdown_cache_file.write_text(markdown, encoding="utf-8")
             logger.info(f"GPT 总结并缓存成功 ({markdown_cache_file})")
             return markdown
@@ -10,6 +10,7 @@ from app.db.provider_dao import (
     delete_provider, get_enabled_providers,
 )
 from app.gpt.gpt_factory import GPTFactory
+from app.gpt.provider.OpenAI_compatible_provider import invalidate_openai_client
 from app.models.model_config import ModelConfig
 
 
@@ -87,7 +88,12 @@ class ProviderService:
         # 过滤掉空值
             filtered_data = {k: v for k, v in data.items() if v is not None and k != 'id'}
             print('更新模型供应商',filtered_data)
+            old = ProviderService.get_provider_by_id(id)
             update_provider(id, **filtered_data)
+            # 地址或密钥变化后，旧配置的客户端不再使用
+            if old and (old["api_key"], old["base_url"]) != (filtered_data.get("api_key", old["api_key"]),
+                                                             filtered_data.get("base_url", old["base_url"])):
+                invalidate_openai_client(api_key=old["api_key"], base_url=old["base_url"])
             return id
 
         except Exception as e:
@@ -96,4 +102,9 @@ class ProviderService:
 
     @staticmethod
     def delete_provider(id: str):
-        return delete_provider(id)
+        old = ProviderService.get_provider_by_id(id)
+        result = delete_provider(id)
+        # 删除后再移除客户端，避免失效与删除之间又读到旧配置
+        if old:
+            invalidate_openai_client(api_key=old["api_key"], base_url=old["base_url"])
+        return result
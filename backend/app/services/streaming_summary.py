@@ -0,0 +1,91 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional
+
+from app.gpt.base import GPT
+from app.models.gpt_model import GPTSource
+from app.models.transcriber_model import TranscriptSegment
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 是否启用流式总结：转写过程中按时间窗口提前做分段总结（map），转写结束后再合并（reduce）
+STREAMING_SUMMARY_ENABLED = os.getenv("STREAMING_SUMMARY", "false").lower() in ("1", "true", "yes")
+# 每个时间窗口的长度（秒）
+STREAMING_SUMMARY_WINDOW = int(os.getenv("STREAMING_SUMMARY_WINDOW", 600))
+# 同时进行的分段总结请求数
+STREAMING_SUMMARY_CONCURRENCY = int(os.getenv("STREAMING_SUMMARY_CONCURRENCY", 2))
+
+
+class StreamingSummarizer:
+    """
+    接收转写器实时产出的片段，凑满一个时间窗口就提交给 GPT 做分段总结，
+    使 LLM 调用与后续音频的转写重叠进行。
+
+    用法：
+        summarizer = StreamingSummarizer(gpt, source)
+        transcriber.transcript_stream(file_path, on_segment=summarizer.feed)
+        partials = summarizer.finish()
+        markdown = gpt.merge_partials(source, partials) if partials else gpt.summarize(source)
+    """
+
+    def __init__(
+        self,
+        gpt: GPT,
+        source: GPTSource,
+        window_seconds: int = STREAMING_SUMMARY_WINDOW,
+        max_workers: int = STREAMING_SUMMARY_CONCURRENCY,
+    ):
+        """
+        :param gpt: GPT 实例，需实现 summarize_partial / merge_partials
+        :param source: 笔记整体信息（标题、标签等），分段总结时使用
+        :param window_seconds: 时间窗口长度（秒）
+        :param max_workers: 并发的分段总结请求数
+        """
+        self.gpt = gpt
+        self.source = source
+        self.window_seconds = window_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="note-map")
+        self._lock = threading.Lock()
+        self._buffer: List[TranscriptSegment] = []
+        self._futures: List[Future] = []
+
+    def feed(self, segment: TranscriptSegment) -> None:
+        """
+        转写器回调：追加一个片段，窗口已满时提交分段总结
+
+        :param segment: 转写片段
+        """
+        with self._lock:
+            self._buffer.append(segment)
+            if segment.end - self._buffer[0].start >= self.window_seconds:
+                self._submit_window()
+
+    def _submit_window(self) -> None:
+        window, self._buffer = self._buffer, []
+        index = len(self._futures) + 1
+        logger.info(f"提交第 {index} 段分段总结 ({window[0].start:.0f}s - {window[-1].end:.0f}s)")
+        self._futures.append(self._executor.submit(self.gpt.summarize_partial, self.source, window, index))
+
+    def finish(self) -> Optional[List[str]]:
+        """
+        转写结束后调用：提交剩余片段并等待所有分段总结完成
+
+        :return: 按时间顺序排列的分段要点；若全程只有一个窗口则返回 None，
+                 由调用方直接对完整转写做一次总结，避免无谓的两轮调用
+        """
+        try:
+            with self._lock:
+                if not self._futures:
+                    self._buffer = []
+                    return None
+                if self._buffer:
+                    self._submit_window()
+                futures = list(self._futures)
+            return [future.result() for future in futures]
+        finally:
+            self._executor.shutdown(wait=False)
+
+    def cancel(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,59 @@
+import asyncio
+import threading
+from typing import Dict, List, Tuple
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class TaskEventBus:
+    """
+    进程内的任务进度事件总线。
+
+    任务在 worker 线程中执行，通过 publish 推送阶段变化与进度；
+    SSE 连接在事件循环中 subscribe 得到一个 asyncio.Queue，事件经 call_soon_threadsafe 投递。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+
+    def subscribe(self, task_id: str) -> asyncio.Queue:
+        """
+        订阅某个任务的事件，必须在事件循环中调用
+
+        :param task_id: 任务 ID
+        :return: 接收事件的队列
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._subscribers.setdefault(task_id, []).append((loop, queue))
+        return queue
+
+    def unsubscribe(self, task_id: str, queue: asyncio.Queue) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(task_id, [])
+            self._subscribers[task_id] = [(l, q) for l, q in subscribers if q is not queue]
+            if not self._subscribers[task_id]:
+                del self._subscribers[task_id]
+
+    def publish(self, task_id: str, event: dict) -> None:
+        """
+        推送事件，可在任意线程调用；没有订阅者时直接丢弃
+
+        :param task_id: 任务 ID
+        :param event: 事件内容，如 {"status": "TRANSCRIBING", "progress": 40}
+        """
+        with self._lock:
+            subscribers = list(self._subscribers.get(task_id, []))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                # 事件循环已关闭，连接已断开
+                logger.debug(f"事件推送失败，订阅者已关闭 (task_id={task_id})")
+
+
+task_event_bus = TaskEventBus()
@@ -0,0 +1,106 @@
+import os
+import threading
+from typing import Callable, List, Optional
+
+from app.db.note_job_dao import (
+    JOB_DONE,
+    JOB_FAILED,
+    claim_next_note_job,
+    count_note_jobs_by_status,
+    enqueue_note_job,
+    get_note_job_position,
+    requeue_running_note_jobs,
+    update_note_job_status,
+)
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class NoteTaskQueue:
+    """
+    基于 SQLite 的持久化笔记任务队列 + 固定大小的 worker 线程池。
+
+    - 任务按提交顺序执行，同时执行的任务数不超过 concurrency（NOTE_WORKER_CONCURRENCY）
+    - 任务参数持久化在 note_jobs 表中，进程重启后未完成的任务会重新入队
+    """
+
+    def __init__(self, handler: Callable[..., None], concurrency: Optional[int] = None, poll_interval: float = 2.0,
+                 wait_ready: Optional[Callable[[float], bool]] = None):
+        """
+        :param handler: 任务执行函数，以 handler(task_id, **payload) 的形式调用
+        :param wait_ready: 领取任务前调用 wait_ready(timeout)，返回 False 时任务继续留在队列中（如等待模型预热）
+        :param concurrency: worker 数量，默认读取环境变量 NOTE_WORKER_CONCURRENCY（默认 2）
+        :param poll_interval: 空闲 worker 检查新任务的间隔（秒）
+        """
+        self.handler = handler
+        self.concurrency = max(1, concurrency or int(os.getenv("NOTE_WORKER_CONCURRENCY", 2)))
+        self.poll_interval = poll_interval
+        self.wait_ready = wait_ready
+        self._wakeup = threading.Condition()
+        self._stopped = threading.Event()
+        self._workers: List[threading.Thread] = []
+
+    def start(self) -> None:
+        if self._workers:
+            return
+        recovered = requeue_running_note_jobs()
+        if recovered:
+            logger.info(f"恢复 {recovered} 个未完成的笔记任务")
+        self._stopped.clear()
+        for i in range(self.concurrency):
+            worker = threading.Thread(target=self._worker_loop, name=f"note-worker-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        logger.info(f"笔记任务队列已启动，worker 数量：{self.concurrency}")
+
+    def stop(self) -> None:
+        self._stopped.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+
+    def submit(self, task_id: str, **payload) -> bool:
+        """
+        提交任务到队列
+
+        :param task_id: 任务 ID
+        :param payload: 传递给 handler 的参数，需可 JSON 序列化
+        :return: 是否入队成功（同一 task_id 正在执行时返回 False）
+        """
+        queued = enqueue_note_job(task_id, payload)
+        if queued:
+            with self._wakeup:
+                self._wakeup.notify()
+        return queued
+
+    def position(self, task_id: str) -> Optional[int]:
+        return get_note_job_position(task_id)
+
+    def stats(self) -> dict:
+        counts = count_note_jobs_by_status()
+        return {
+            "workers": self.concurrency,
+            "queued": counts.get("queued", 0),
+            "running": counts.get("running", 0),
+            "done": counts.get("done", 0),
+            "failed": counts.get("failed", 0),
+        }
+
+    def _worker_loop(self) -> None:
+        while not self._stopped.is_set():
+            if self.wait_ready and not self.wait_ready(self.poll_interval):
+                continue
+            job = claim_next_note_job()
+            if job is None:
+                with self._wakeup:
+                    self._wakeup.wait(timeout=self.poll_interval)
+                continue
+
+            task_id, payload = job
+            logger.info(f"开始执行队列任务 (task_id={task_id})")
+            try:
+                self.handler(task_id, **payload)
+                update_note_job_status(task_id, JOB_DONE)
+            except Exception as e:
+                logger.error(f"队列任务执行失败 (task_id={task_id})：{e}", exc_info=True)
+                update_note_job_status(task_id, JOB_FAILED)
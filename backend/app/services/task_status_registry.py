@@ -0,0 +1,222 @@
+import atexit
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from app.enmus.task_status_enums import TaskStatus
+from app.services.task_events import task_event_bus
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+NOTE_OUTPUT_DIR = Path(os.getenv("NOTE_OUTPUT_DIR", "note_results"))
+
+
+class TaskStatusRegistry:
+    """
+    进程内的任务状态表，所有状态读取都走内存。
+
+    - set() 只更新内存并推送进度事件，不做磁盘 IO
+    - 后台线程把有变化的状态按批写回 {task_id}.status.json（write-behind），
+      文件格式与原来一致，进程重启后仍可读取
+    - 内存未命中时（如重启前的任务）从磁盘读取一次并缓存
+    - 笔记结果同样缓存在内存中（LRU），避免每次查询都解析结果 JSON
+    - 总结阶段 GPT 流式输出的部分 Markdown 只保存在内存中，任务结束后丢弃
+    """
+
+    def __init__(self, output_dir: Path = NOTE_OUTPUT_DIR, flush_interval: float = 0.5,
+                 max_entries: int = 4096, max_results: int = 128):
+        """
+        :param output_dir: 状态文件目录
+        :param flush_interval: 批量落盘间隔（秒）
+        :param max_entries: 内存中保留的状态条数上限（仅淘汰已落盘的条目）
+        :param max_results: 内存中缓存的笔记结果条数上限
+        """
+        self.output_dir = output_dir
+        self.flush_interval = flush_interval
+        self.max_entries = max_entries
+        self.max_results = max_results
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._statuses: "OrderedDict[str, dict]" = OrderedDict()
+        self._results: "OrderedDict[str, dict]" = OrderedDict()
+        self._partials: Dict[str, List[str]] = {}
+        self._dirty = set()
+        self._flusher: Optional[threading.Thread] = None
+        atexit.register(self.flush)
+
+    # ---------------- 状态 ----------------
+
+    def set(self, task_id: str, status: Union[str, TaskStatus], message: Optional[str] = None) -> None:
+        """
+        更新任务状态（不阻塞调用方）
+
+        :param task_id: 任务 ID
+        :param status: TaskStatus 枚举或自定义状态字符串
+        :param message: 可选消息，用于记录失败原因等
+        """
+        if not task_id:
+            return
+        data = {"status": status.value if isinstance(status, TaskStatus) else status}
+        if message:
+            data["message"] = message
+
+        with self._wakeup:
+            self._statuses[task_id] = data
+            self._statuses.move_to_end(task_id)
+            self._dirty.add(task_id)
+            if status not in (TaskStatus.SUCCESS, TaskStatus.SUCCESS.value):
+                # 任务重新执行时旧结果失效
+                self._results.pop(task_id, None)
+            if data["status"] in (TaskStatus.SUMMARIZING.value, TaskStatus.SUCCESS.value, TaskStatus.FAILED.value):
+                # 每次进入总结阶段重新累积；任务结束后以最终结果为准
+                self._partials.pop(task_id, None)
+            self._ensure_flusher()
+            self._wakeup.notify()
+
+        task_event_bus.publish(task_id, {**data, "progress": TaskStatus.progress(status)})
+
+    def get(self, task_id: str) -> Optional[dict]:
+        """
+        读取任务状态
+
+        :return: {"status": ..., ["message": ...]}，不存在时返回 None
+        """
+        with self._lock:
+            data = self._statuses.get(task_id)
+            if data is not None:
+                return dict(data)
+
+        data = self._read_json(self._status_file(task_id))
+        if data is not None:
+            with self._lock:
+                # 并发写入的新状态优先
+                data = self._statuses.setdefault(task_id, data)
+                self._evict()
+        return dict(data) if data is not None else None
+
+    # ---------------- 部分结果 ----------------
+
+    def append_partial(self, task_id: str, delta: str) -> None:
+        """
+        追加 GPT 流式输出的一段文本，并推送给订阅者（markdown_delta）
+
+        :param task_id: 任务 ID
+        :param delta: 新生成的文本片段
+        """
+        if not task_id or not delta:
+            return
+        with self._lock:
+            self._partials.setdefault(task_id, []).append(delta)
+        task_event_bus.publish(task_id, {
+            "status": TaskStatus.SUMMARIZING.value,
+            "progress": TaskStatus.progress(TaskStatus.SUMMARIZING),
+            "markdown_delta": delta,
+        })
+
+    def get_partial(self, task_id: str) -> Optional[str]:
+        """总结阶段已生成的部分 Markdown，没有时返回 None"""
+        with self._lock:
+            parts = self._partials.get(task_id)
+            return "".join(parts) if parts else None
+
+    # ---------------- 结果 ----------------
+
+    def set_result(self, task_id: str, result: dict) -> None:
+        with self._lock:
+            self._results[task_id] = result
+            self._results.move_to_end(task_id)
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+
+    def get_result(self, task_id: str) -> Optional[dict]:
+        with self._lock:
+            result = self._results.get(task_id)
+            if result is not None:
+                self._results.move_to_end(task_id)
+                return result
+
+        result = self._read_json(self.output_dir / f"{task_id}.json")
+        if result is not None:
+            self.set_result(task_id, result)
+        return result
+
+    def clear_result(self, task_id: str) -> None:
+        """
+        任务重试时清除旧结果：内存缓存与 {task_id}.json 一并删除，
+        否则 get_result 未命中内存时会从旧文件读回并重新缓存
+        """
+        with self._lock:
+            self._results.pop(task_id, None)
+            self._partials.pop(task_id, None)
+        try:
+            (self.output_dir / f"{task_id}.json").unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"删除旧结果文件失败 (task_id={task_id})：{e}")
+
+    # ---------------- 落盘 ----------------
+
+    def flush(self) -> None:
+        """把所有未落盘的状态写入磁盘"""
+        with self._lock:
+            batch = {task_id: dict(self._statuses[task_id]) for task_id in self._dirty if task_id in self._statuses}
+            self._dirty.clear()
+        if not batch:
+            return
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        for task_id, data in batch.items():
+            status_file = self._status_file(task_id)
+            try:
+                temp_file = status_file.with_suffix('.tmp')
+                with temp_file.open('w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2)
+                temp_file.replace(status_file)
+            except Exception as e:
+                logger.error(f"写入状态文件失败 (task_id={task_id})：{e}")
+        logger.debug(f"状态批量落盘 {len(batch)} 条")
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is None or not self._flusher.is_alive():
+            self._flusher = threading.Thread(target=self._flush_loop, name="task-status-flusher", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        while True:
+            with self._wakeup:
+                while not self._dirty:
+                    self._wakeup.wait()
+            # 等待一个间隔，把这段时间内的多次变化合并为一次写入
+            time.sleep(self.flush_interval)
+            self.flush()
+            with self._lock:
+                self._evict()
+
+    def _evict(self) -> None:
+        # 调用方需持有锁；只淘汰已落盘的旧条目
+        for task_id in list(self._statuses.keys()):
+            if len(self._statuses) <= self.max_entries:
+                break
+            if task_id not in self._dirty:
+                del self._statuses[task_id]
+
+    def _status_file(self, task_id: str) -> Path:
+        return self.output_dir / f"{task_id}.status.json"
+
+    @staticmethod
+    def _read_json(path: Path) -> Optional[dict]:
+        if not path.exists():
+            return None
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"读取文件失败 ({path})：{e}")
+            return None
+
+
+task_status_registry = TaskStatusRegistry()
@@ -1,9 +1,40 @@
+import csv
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
 
-from app.models.transcriber_model import TranscriptResult
+import ffmpeg
+
+from app.models.transcriber_model import TranscriptResult, TranscriptSegment
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 各转写器类共享的分片并发数限制（同一进程内多个任务合计不超过 chunk_concurrency）
+_chunk_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+_chunk_semaphores_lock = threading.Lock()
 
 
 class Transcriber(ABC):
+    # 转写前统一转换的音频格式（见 app/utils/audio_normalizer.AUDIO_FORMATS），None 表示直接使用下载的文件
+    preferred_audio_format: Optional[str] = None
+
+    # 远程接口的单次请求限制，超出时由 transcript_in_chunks 切片后分别识别；None 表示不限制
+    max_chunk_seconds: Optional[float] = None
+    max_chunk_bytes: Optional[int] = None
+    # 同时进行的分片请求数（按转写器类统计）与单个分片的重试次数
+    chunk_concurrency: int = 2
+    chunk_retries: int = 2
+
+    # transcript / transcript_stream 是否接受 language 参数（已知语言时跳过自动检测）
+    supports_language_hint: bool = False
+
     @abstractmethod
     def transcript(self,file_path:str)->TranscriptResult:
         '''
@@ -13,6 +44,27 @@ class Transcriber(ABC):
         '''
         pass
 
+    def transcript_stream(self, file_path: str, on_segment: Callable[[TranscriptSegment], None]) -> TranscriptResult:
+        '''
+        流式转写：每产生一个片段就回调 on_segment，结束后返回完整结果。
+        默认实现在整段转写完成后依次回调，能边解码边产出片段的转写器应覆盖此方法。
+
+        :param file_path: 音频路径
+        :param on_segment: 片段回调
+        :return: 返回一个 TranscriptResult 类
+        '''
+        result = self.transcript(file_path=file_path)
+        for segment in result.segments:
+            on_segment(segment)
+        return result
+
+    def cache_signature(self) -> str:
+        '''
+        转写器签名，用于区分不同转写器/模型产生的转写缓存
+        :return: 签名字符串
+        '''
+        return self.__class__.__name__
+
     def on_finish(self,video_path:str,result: TranscriptResult)->None:
         '''
         当音频转录完成时调用
@@ -20,4 +72,109 @@ class Transcriber(ABC):
         :param result: 识别结果
         :return:
         '''
-        pass
\ No newline at end of file
+        pass
+
+    # ---------------- 分片识别 ----------------
+
+    def transcript_in_chunks(self, file_path: str,
+                             transcribe_piece: Callable[[str], TranscriptResult]) -> TranscriptResult:
+        """
+        按 max_chunk_seconds / max_chunk_bytes 把音频切成若干片，并发调用 transcribe_piece 识别，
+        再按每片的起始时间平移时间戳合并为一个结果。失败的分片单独重试，不影响已完成的分片。
+        音频未超出限制时直接整体识别。
+
+        :param file_path: 音频路径
+        :param transcribe_piece: 识别单个音频文件的函数
+        :return: 合并后的 TranscriptResult
+        """
+        piece_seconds = self._piece_seconds(file_path)
+        if not piece_seconds:
+            return transcribe_piece(file_path)
+
+        work_dir = tempfile.mkdtemp(prefix="asr_chunks_")
+        try:
+            pieces = self._split_audio(file_path, piece_seconds, work_dir)
+            logger.info(f"音频超出单次识别限制，切分为 {len(pieces)} 片（每片约 {piece_seconds:.0f}s）：{file_path}")
+            semaphore = self._chunk_semaphore()
+
+            def run(piece: Tuple[str, float]) -> TranscriptResult:
+                path, _ = piece
+                for attempt in range(self.chunk_retries + 1):
+                    try:
+                        with semaphore:
+                            return transcribe_piece(path)
+                    except Exception as e:
+                        if attempt >= self.chunk_retries:
+                            raise
+                        logger.warning(f"分片识别失败，{2 ** attempt}s 后重试（{attempt + 1}/{self.chunk_retries}）：{path}，{e}")
+                        time.sleep(2 ** attempt)
+
+            with ThreadPoolExecutor(max_workers=min(self.chunk_concurrency, len(pieces)),
+                                    thread_name_prefix="asr-chunk") as executor:
+                results = list(executor.map(run, pieces))
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        segments: List[TranscriptSegment] = []
+        for (_, offset), result in zip(pieces, results):
+            segments.extend(
+                TranscriptSegment(start=seg.start + offset, end=seg.end + offset, text=seg.text)
+                for seg in result.segments
+            )
+        return TranscriptResult(
+            language=next((r.language for r in results if r.language), None),
+            full_text=" ".join(r.full_text for r in results if r.full_text).strip(),
+            segments=segments,
+            raw={"chunks": [r.raw for r in results]},
+        )
+
+    def _piece_seconds(self, file_path: str) -> Optional[float]:
+        # 计算每片时长；未超出限制时返回 None
+        if not self.max_chunk_seconds and not self.max_chunk_bytes:
+            return None
+        try:
+            duration = float(ffmpeg.probe(file_path)["format"]["duration"])
+        except Exception as e:
+            logger.warning(f"获取音频时长失败，按整体识别：{e}")
+            return None
+        size = os.path.getsize(file_path)
+
+        limits = []
+        if self.max_chunk_seconds:
+            limits.append(self.max_chunk_seconds)
+        if self.max_chunk_bytes and duration > 0:
+            # 留 10% 余量，容器头与码率波动不超限
+            limits.append(self.max_chunk_bytes / (size / duration) * 0.9)
+        piece_seconds = min(limits)
+        return piece_seconds if duration > piece_seconds else None
+
+    @staticmethod
+    def _split_audio(file_path: str, piece_seconds: float, work_dir: str) -> List[Tuple[str, float]]:
+        """
+        用 ffmpeg segment 复用器无损切片（不重新编码）
+
+        :return: [(分片路径, 起始秒数), ...]
+        """
+        ext = os.path.splitext(file_path)[1] or ".wav"
+        list_file = os.path.join(work_dir, "pieces.csv")
+        command = [
+            "ffmpeg", "-y", "-i", file_path, "-vn",
+            "-f", "segment", "-segment_time", f"{piece_seconds:.3f}",
+            "-segment_list", list_file, "-segment_list_type", "csv",
+            "-c", "copy", os.path.join(work_dir, f"piece_%04d{ext}"),
+        ]
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
+
+        pieces = []
+        with open(list_file, newline="", encoding="utf-8") as f:
+            for row in csv.reader(f):
+                if row:
+                    pieces.append((os.path.join(work_dir, row[0]), float(row[1])))
+        return pieces
+
+    def _chunk_semaphore(self) -> threading.BoundedSemaphore:
+        with _chunk_semaphores_lock:
+            key = self.__class__.__name__
+            if key not in _chunk_semaphores:
+                _chunk_semaphores[key] = threading.BoundedSemaphore(self.chunk_concurrency)
+            return _chunk_semaphores[key]
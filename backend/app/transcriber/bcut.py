@@ -1,13 +1,17 @@
 import json
 import logging
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from typing import Optional, List, Dict, Union
 
-import requests
+import ffmpeg
 
 from app.decorators.timeit import timeit
 from app.models.transcriber_model import TranscriptSegment, TranscriptResult
 from app.transcriber.base import Transcriber
+from app.utils.http_session import get_session
 from app.utils.logger import get_logger
 from events import transcription_finished
 
@@ -29,44 +33,46 @@ API_QUERY_RESULT = API_BASE_URL + "/task/result"
 
 logger = get_logger(__name__)
 
+# 分片并发上传数，同时驻留内存的数据最多为 并发数 * 分片大小
+BCUT_UPLOAD_CONCURRENCY = int(os.getenv("BCUT_UPLOAD_CONCURRENCY", 4))
+
+@dataclass
+class BcutJob:
+    """一次识别任务的上传/任务状态，每次 transcript 调用单独创建，避免并发任务互相覆盖"""
+    in_boss_key: Optional[str] = None
+    resource_id: Optional[str] = None
+    upload_id: Optional[str] = None
+    upload_urls: List[str] = field(default_factory=list)
+    per_size: Optional[int] = None
+    clips: Optional[int] = None
+    etags: List[str] = field(default_factory=list)
+    download_url: Optional[str] = None
+    task_id: Optional[str] = None
+
+
 class BcutTranscriber(Transcriber):
-    """必剪 语音识别接口"""
+    """必剪 语音识别接口（实例在进程内共享，不保存任务状态）"""
+    # 上传时声明的资源类型为 mp3
+    preferred_audio_format = "mp3"
     headers = {
         'User-Agent': 'Bilibili/1.0.0 (https://www.bilibili.com)',
         'Content-Type': 'application/json'
     }
 
     def __init__(self):
-        self.session = requests.Session()
-        self.task_id = None
-        self.__etags = []
-
-        self.__in_boss_key: Optional[str] = None
-        self.__resource_id: Optional[str] = None
-        self.__upload_id: Optional[str] = None
-        self.__upload_urls: List[str] = []
-        self.__per_size: Optional[int] = None
-        self.__clips: Optional[int] = None
-
-        self.__etags: List[str] = []
-        self.__download_url: Optional[str] = None
-        self.task_id: Optional[str] = None
+        # 共享连接池，任务状态保存在各自的 BcutJob 中
+        self.session = get_session("bcut")
         
-    def _load_file(self, file_path: str) -> bytes:
-        """读取文件内容"""
-        with open(file_path, 'rb') as f:
-            return f.read()
-
-    def _upload(self, file_path: str) -> None:
+    def _upload(self, job: BcutJob, file_path: str) -> None:
         """申请上传"""
-        file_binary = self._load_file(file_path)
-        if not file_binary:
+        file_size = os.path.getsize(file_path)
+        if not file_size:
             raise ValueError("无法读取文件数据")
             
         payload = json.dumps({
             "type": 2,
             "name": "audio.mp3",
-            "size": len(file_binary),
+            "size": file_size,
             "ResourceFileType": "mp3",
             "model_id": "8",
         })
@@ -80,42 +86,51 @@ class BcutTranscriber(Transcriber):
         resp = resp.json()
         resp_data = resp["data"]
 
-        self.__in_boss_key = resp_data["in_boss_key"]
-        self.__resource_id = resp_data["resource_id"]
-        self.__upload_id = resp_data["upload_id"]
-        self.__upload_urls = resp_data["upload_urls"]
-        self.__per_size = resp_data["per_size"]
-        self.__clips = len(resp_data["upload_urls"])
+        job.in_boss_key = resp_data["in_boss_key"]
+        job.resource_id = resp_data["resource_id"]
+        job.upload_id = resp_data["upload_id"]
+        job.upload_urls = resp_data["upload_urls"]
+        job.per_size = resp_data["per_size"]
+        job.clips = len(resp_data["upload_urls"])
 
         logger.info(
-            f"申请上传成功, 总计大小{resp_data['size'] // 1024}KB, {self.__clips}分片, 分片大小{resp_data['per_size'] // 1024}KB: {self.__in_boss_key}"
+            f"申请上传成功, 总计大小{resp_data['size'] // 1024}KB, {job.clips}分片, 分片大小{resp_data['per_size'] // 1024}KB: {job.in_boss_key}"
         )
-        self.__upload_part(file_binary)
-        self.__commit_upload()
-
-    def __upload_part(self, file_binary: bytes) -> None:
-        """上传音频数据"""
-        for clip in range(self.__clips):
-            start_range = clip * self.__per_size
-            end_range = min((clip + 1) * self.__per_size, len(file_binary))
+        self.__upload_part(job, file_path, file_size)
+        self.__commit_upload(job)
+
+    def __upload_part(self, job: BcutJob, file_path: str, file_size: int) -> None:
+        """并发上传音频数据，每个分片单独从磁盘读取，不把整个文件载入内存"""
+
+        def upload_clip(clip: int) -> str:
+            start_range = clip * job.per_size
+            end_range = min((clip + 1) * job.per_size, file_size)
+            with open(file_path, 'rb') as f:
+                f.seek(start_range)
+                data = f.read(end_range - start_range)
             logger.info(f"开始上传分片{clip}: {start_range}-{end_range}")
             resp = self.session.put(
-                self.__upload_urls[clip],
-                data=file_binary[start_range:end_range],
+                job.upload_urls[clip],
+                data=data,
                 headers={'Content-Type': 'application/octet-stream'}
             )
             resp.raise_for_status()
             etag = resp.headers.get("Etag", "").strip('"')
-            self.__etags.append(etag)
             logger.info(f"分片{clip}上传成功: {etag}")
+            return etag
 
-    def __commit_upload(self) -> None:
+        workers = max(1, min(BCUT_UPLOAD_CONCURRENCY, job.clips))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcut-upload") as executor:
+            # map 保持分片顺序，提交时 Etags 需与分片一一对应
+            job.etags = list(executor.map(upload_clip, range(job.clips)))
+
+    def __commit_upload(self, job: BcutJob) -> None:
         """提交上传数据"""
         data = json.dumps({
-            "InBossKey": self.__in_boss_key,
-            "ResourceId": self.__resource_id,
-            "Etags": ",".join(self.__etags),
-            "UploadId": self.__upload_id,
+            "InBossKey": job.in_boss_key,
+            "ResourceId": job.resource_id,
+            "Etags": ",".join(job.etags),
+            "UploadId": job.upload_id,
             "model_id": "8",
         })
         resp = self.session.post(
@@ -131,13 +146,13 @@ class BcutTranscriber(Transcriber):
             logger.error(error_msg)
             raise Exception(error_msg)
             
-        self.__download_url = resp["data"]["download_url"]
-        logger.info(f"提交成功，下载链接: {self.__download_url}")
+        job.download_url = resp["data"]["download_url"]
+        logger.info(f"提交成功，下载链接: {job.download_url}")
 
-    def _create_task(self) -> str:
+    def _create_task(self, job: BcutJob) -> str:
         """开始创建转换任务"""
         resp = self.session.post(
-            API_CREATE_TASK, json={"resource": self.__download_url, "model_id": "8"}, headers=self.headers
+            API_CREATE_TASK, json={"resource": job.download_url, "model_id": "8"}, headers=self.headers
         )
         resp.raise_for_status()
         resp = resp.json()
@@ -146,15 +161,15 @@ class BcutTranscriber(Transcriber):
             logger.error(error_msg)
             raise Exception(error_msg)
             
-        self.task_id = resp["data"]["task_id"]
-        logger.info(f"任务已创建: {self.task_id}")
-        return self.task_id
+        job.task_id = resp["data"]["task_id"]
+        logger.info(f"任务已创建: {job.task_id}")
+        return job.task_id
 
-    def _query_result(self) -> dict:
+    def _query_result(self, job: BcutJob) -> dict:
         """查询转换结果"""
         resp = self.session.get(
             API_QUERY_RESULT, 
-            params={"model_id": 7, "task_id": self.task_id}, 
+            params={"model_id": 7, "task_id": job.task_id}, 
             headers=self.headers
         )
         resp.raise_for_status()
@@ -171,21 +186,26 @@ class BcutTranscriber(Transcriber):
         """执行识别过程，符合 Transcriber 接口"""
         try:
             logger.info(f"开始处理文件: {file_path}")
+            job = BcutJob()
             
             # 上传文件
             logger.info("正在上传文件...")
-            self._upload(file_path)
+            self._upload(job, file_path)
             
             # 创建任务
             logger.info("提交转录任务...")
-            self._create_task()
+            self._create_task(job)
             
-            # 轮询检查任务状态
-            logger.info("等待转录结果...")
+            # 轮询检查任务状态：按音频时长估计首次查询时间，之后逐步拉长间隔
+            duration = self._probe_duration(file_path)
+            first_wait, timeout = self._polling_plan(duration)
+            logger.info(f"等待转录结果...（音频时长 {duration or '未知'}s，{first_wait:.0f}s 后开始查询）")
             task_resp = None
-            max_retries = 500
-            for i in range(max_retries):
-                task_resp = self._query_result()
+            started = time.monotonic()
+            interval = 1.0
+            time.sleep(first_wait)
+            while True:
+                task_resp = self._query_result(job)
                 
                 if task_resp["state"] == 4:  # 完成状态
                     break
@@ -193,12 +213,14 @@ class BcutTranscriber(Transcriber):
                     error_msg = f"B站ASR任务失败，状态码: {task_resp['state']}"
                     logger.error(error_msg)
                     raise Exception(error_msg)
+
+                elapsed = time.monotonic() - started
+                if elapsed > timeout:
+                    break
+                logger.info(f"转录进行中... 已等待 {elapsed:.0f}s")
                     
-                # 每隔一段时间打印进度
-                if i % 10 == 0:
-                    logger.info(f"转录进行中... {i}/{max_retries}")
-                    
-                time.sleep(1)
+                time.sleep(interval)
+                interval = min(interval * 1.5, 10.0)
                 
             if not task_resp or task_resp["state"] != 4:
                 error_msg = f"B站ASR任务未能完成，状态: {task_resp.get('state') if task_resp else 'Unknown'}"
@@ -243,6 +265,28 @@ class BcutTranscriber(Transcriber):
             logger.error(f"B站ASR处理失败: {str(e)}")
             raise
 
+    @staticmethod
+    def _probe_duration(file_path: str) -> Optional[float]:
+        try:
+            return float(ffmpeg.probe(file_path)["format"]["duration"])
+        except Exception as e:
+            logger.warning(f"获取音频时长失败: {e}")
+            return None
+
+    @staticmethod
+    def _polling_plan(duration: Optional[float]) -> tuple:
+        """
+        根据音频时长估计轮询计划
+
+        :return: (首次查询前等待秒数, 总超时秒数)；时长未知时首次 1 秒后查询、最多等待 10 分钟
+        """
+        if not duration:
+            return 1.0, 600.0
+        # 识别速度约为实时的 30 倍，首次查询前先等待预估耗时（时长 / 30）的一半
+        first_wait = min(max(duration / 60.0, 1.0), 30.0)
+        timeout = max(600.0, duration)
+        return first_wait, timeout
+
     def on_finish(self, video_path: str, result: TranscriptResult) -> None:
         """转录完成的回调"""
         logger.info(f"B站ASR转写完成: {video_path}")
@@ -1,7 +1,11 @@
 from abc import ABC
 import os
+import threading
+import time
+from typing import Optional
 
 from app.decorators.timeit import timeit
+from app.gpt.provider.OpenAI_compatible_provider import add_invalidation_listener, get_openai_client
 from app.models.transcriber_model import TranscriptResult, TranscriptSegment
 from app.services.provider import ProviderService
 from app.transcriber.base import Transcriber
@@ -10,17 +14,49 @@ from dotenv import load_dotenv
 load_dotenv()
 
 class GroqTranscriber(Transcriber, ABC):
+    # 上传体积越小越快，且不超过接口的文件大小限制
+    preferred_audio_format = "flac"
+    # 单次上传文件大小上限（免费版 25MB），超出时切片并发识别
+    max_chunk_bytes = 24 * 1024 * 1024
+    chunk_concurrency = 4
 
+    # 供应商配置的缓存时间（秒），避免每个分片都查询一次数据库；配置修改或删除时立即失效
+    PROVIDER_TTL = 60
+    _provider: Optional[dict] = None
+    _provider_loaded_at = 0.0
+    _provider_lock = threading.Lock()
+
+    @classmethod
+    def _get_provider(cls) -> dict:
+        with cls._provider_lock:
+            if cls._provider is None or time.monotonic() - cls._provider_loaded_at >= cls.PROVIDER_TTL:
+                provider = ProviderService.get_provider_by_id('groq')
+                if not provider:
+                    raise Exception("Groq 供应商未配置,请配置以后使用。")
+                cls._provider = provider
+                cls._provider_loaded_at = time.monotonic()
+            return cls._provider
+
+    @classmethod
+    def drop_cached_provider(cls) -> None:
+        with cls._provider_lock:
+            cls._provider = None
+
+    @classmethod
+    def _get_client(cls) -> OpenAI:
+        provider = cls._get_provider()
+        # 客户端按配置复用（自带连接池，可并发调用），配置修改后自动换用新客户端
+        return get_openai_client(api_key=provider.get('api_key'), base_url=provider.get('base_url'))
+
+    def cache_signature(self) -> str:
+        return f"groq-{os.getenv('GROQ_TRANSCRIBER_MODEL')}"
 
     @timeit
     def transcript(self, file_path: str) -> TranscriptResult:
-        provider = ProviderService.get_provider_by_id('groq')
-        if not provider:
-            raise Exception("Groq 供应商未配置,请配置以后使用。")
-        client = OpenAI(
-            api_key=provider.get('api_key'),
-            base_url=provider.get('base_url')
-        )
+        return self.transcript_in_chunks(file_path, self._transcribe_piece)
+
+    def _transcribe_piece(self, file_path: str) -> TranscriptResult:
+        client = self._get_client()
         filename = file_path
 
         with open(filename, "rb") as file:
@@ -50,3 +86,6 @@ class GroqTranscriber(Transcriber, ABC):
             raw=transcription.to_dict()
         )
         return result
+
+
+add_invalidation_listener(GroqTranscriber.drop_cached_provider)
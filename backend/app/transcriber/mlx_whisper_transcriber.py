@@ -14,6 +14,8 @@ from events import transcription_finished
 logger = get_logger(__name__)
 
 class MLXWhisperTranscriber(Transcriber):
+    preferred_audio_format = "wav"
+
     def __init__(
             self,
             model_size: str = "base"
@@ -45,6 +47,9 @@ class MLXWhisperTranscriber(Transcriber):
         
         logger.info(f"初始化 MLX Whisper 转录器，模型：{self.model_name}")
 
+    def cache_signature(self) -> str:
+        return f"mlx-whisper-{self.model_size}"
+
     @timeit
     def transcript(self, file_path: str) -> TranscriptResult:
         try:
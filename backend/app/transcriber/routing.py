@@ -0,0 +1,187 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+import ffmpeg
+
+from app.models.transcriber_model import TranscriptResult, TranscriptSegment
+from app.transcriber.base import Transcriber
+from app.utils.audio_normalizer import normalize_audio
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class BackendStats:
+    # 每分钟音频的处理耗时（秒）的指数滑动平均，None 表示尚无样本
+    seconds_per_minute: Optional[float] = None
+    # 失败率的指数滑动平均
+    error_rate: float = 0.0
+    consecutive_failures: int = 0
+    # 连续失败后暂停使用，直到该时间点（time.monotonic）
+    cooldown_until: float = 0.0
+    calls: int = 0
+
+
+class RoutingTranscriber(Transcriber):
+    """
+    在多个转写后端之间路由：按每分钟音频的滑动平均耗时与失败率挑选最快的可用后端，
+    失败时依次回退到下一个后端；连续失败的后端暂停一段时间（指数退避）。
+
+    尚无样本的后端按配置顺序优先尝试，以便尽快获得各后端的耗时数据。
+    """
+
+    # 滑动平均的平滑系数，越大越看重最近的样本
+    EWMA_ALPHA = 0.3
+    # 失败率对排序的惩罚权重
+    ERROR_PENALTY = 4.0
+    BASE_COOLDOWN = 30.0
+    MAX_COOLDOWN = 600.0
+
+    def __init__(self, backends: Dict[str, Callable[[], Transcriber]]):
+        """
+        :param backends: 后端名 -> 获取转写器实例的函数（按需创建，避免启动时加载全部模型），顺序即默认优先级
+        """
+        if not backends:
+            raise ValueError("至少需要配置一个转写后端")
+        self._factories = backends
+        self._order: List[str] = list(backends.keys())
+        self._instances: Dict[str, Transcriber] = {}
+        self._stats: Dict[str, BackendStats] = {name: BackendStats() for name in self._order}
+        # 只保护路由统计；后端创建（可能要加载模型）使用各自的锁，不阻塞其他后端与统计更新
+        self._lock = threading.Lock()
+        self._init_locks: Dict[str, threading.Lock] = {name: threading.Lock() for name in self._order}
+
+    def cache_signature(self) -> str:
+        # 自动路由的结果可能来自任意后端，统一使用一个签名
+        return "auto-" + "-".join(self._order)
+
+    # 语言提示转交给支持的后端
+    supports_language_hint = True
+
+    def transcript(self, file_path: str, language: Optional[str] = None) -> TranscriptResult:
+        return self._route(file_path, on_segment=None, language=language)
+
+    def transcript_stream(self, file_path: str, on_segment: Callable[[TranscriptSegment], None],
+                          language: Optional[str] = None) -> TranscriptResult:
+        return self._route(file_path, on_segment=on_segment, language=language)
+
+    def stats(self) -> Dict[str, dict]:
+        """各后端当前的路由统计"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                name: {
+                    "seconds_per_minute": stats.seconds_per_minute,
+                    "error_rate": round(stats.error_rate, 3),
+                    "calls": stats.calls,
+                    "cooling_down": stats.cooldown_until > now,
+                }
+                for name, stats in self._stats.items()
+            }
+
+    def warm_up(self) -> None:
+        """提前创建各后端实例（如加载本地模型），单个后端失败只记录日志"""
+        for name in self._order:
+            try:
+                self._backend(name)
+            except Exception as e:
+                logger.warning(f"转写后端 {name} 预热失败：{e}")
+
+    # ---------------- 路由 ----------------
+
+    def _route(self, file_path: str,
+               on_segment: Optional[Callable[[TranscriptSegment], None]],
+               language: Optional[str] = None) -> TranscriptResult:
+        minutes = self._audio_minutes(file_path)
+        emitted_until = [0.0]
+
+        def forward(segment: TranscriptSegment) -> None:
+            # 回退到下一个后端后，已推送过的时间段不再重复推送
+            if segment.start + 0.01 >= emitted_until[0]:
+                emitted_until[0] = segment.end
+                on_segment(segment)
+
+        last_error: Optional[Exception] = None
+        for name in self._candidates():
+            started = time.monotonic()
+            try:
+                backend = self._backend(name)
+                audio_path = normalize_audio(file_path, backend.preferred_audio_format)
+                logger.info(f"转写路由选择后端：{name}")
+                kwargs = {"language": language} if language and backend.supports_language_hint else {}
+                if on_segment:
+                    result = backend.transcript_stream(file_path=audio_path, on_segment=forward, **kwargs)
+                else:
+                    result = backend.transcript(file_path=audio_path, **kwargs)
+                if result is None:
+                    raise RuntimeError(f"{name} 未返回转写结果")
+            except Exception as e:
+                last_error = e
+                self._record_failure(name)
+                logger.warning(f"转写后端 {name} 失败，尝试下一个后端：{e}")
+                continue
+
+            self._record_success(name, time.monotonic() - started, minutes)
+            return result
+
+        raise RuntimeError(f"所有转写后端均失败：{last_error}")
+
+    def _candidates(self) -> List[str]:
+        now = time.monotonic()
+        with self._lock:
+            def score(name: str) -> tuple:
+                stats = self._stats[name]
+                if stats.seconds_per_minute is None:
+                    return 0, self._order.index(name)
+                return 1, stats.seconds_per_minute * (1 + self.ERROR_PENALTY * stats.error_rate)
+
+            healthy = [name for name in self._order if self._stats[name].cooldown_until <= now]
+            cooling = [name for name in self._order if name not in healthy]
+            # 暂停中的后端排在最后，作为最终兜底
+            return sorted(healthy, key=score) + sorted(cooling, key=lambda n: self._stats[n].cooldown_until)
+
+    def _backend(self, name: str) -> Transcriber:
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._init_locks[name]:
+            # 双重检查：等锁期间其他线程可能已创建完成
+            if name not in self._instances:
+                self._instances[name] = self._factories[name]()
+            return self._instances[name]
+
+    def _record_success(self, name: str, elapsed: float, minutes: Optional[float]) -> None:
+        with self._lock:
+            stats = self._stats[name]
+            stats.calls += 1
+            stats.consecutive_failures = 0
+            stats.cooldown_until = 0.0
+            stats.error_rate *= 1 - self.EWMA_ALPHA
+            if minutes:
+                sample = elapsed / minutes
+                if stats.seconds_per_minute is None:
+                    stats.seconds_per_minute = sample
+                else:
+                    stats.seconds_per_minute += self.EWMA_ALPHA * (sample - stats.seconds_per_minute)
+            logger.info(f"转写后端 {name} 完成，耗时 {elapsed:.1f}s，"
+                        f"平均每分钟音频 {stats.seconds_per_minute or 0:.2f}s")
+
+    def _record_failure(self, name: str) -> None:
+        with self._lock:
+            stats = self._stats[name]
+            stats.calls += 1
+            stats.consecutive_failures += 1
+            stats.error_rate += self.EWMA_ALPHA * (1 - stats.error_rate)
+            cooldown = min(self.BASE_COOLDOWN * 2 ** (stats.consecutive_failures - 1), self.MAX_COOLDOWN)
+            stats.cooldown_until = time.monotonic() + cooldown
+
+    @staticmethod
+    def _audio_minutes(file_path: str) -> Optional[float]:
+        try:
+            return float(ffmpeg.probe(file_path)["format"]["duration"]) / 60.0
+        except Exception as e:
+            logger.warning(f"获取音频时长失败，本次不计入耗时统计：{e}")
+            return None
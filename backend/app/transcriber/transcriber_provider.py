@@ -1,11 +1,18 @@
 import os
 import platform
+import threading
+import time
 from enum import Enum
+from typing import Optional
 
 from app.transcriber.groq import GroqTranscriber
 from app.transcriber.whisper import WhisperTranscriber
+from app.transcriber.whisper_profiles import get_whisper_profile
+from app.transcriber.whisper_tuning import get_tuned_config
 from app.transcriber.bcut import BcutTranscriber
 from app.transcriber.kuaishou import KuaishouTranscriber
+from app.transcriber.routing import RoutingTranscriber
+from app.utils.env_checker import is_cuda_available
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -16,6 +23,7 @@ class TranscriberType(str, Enum):
     BCUT = "bcut"
     KUAISHOU = "kuaishou"
     GROQ = "groq"
+    AUTO = "auto"
 
 # 仅在 Apple 平台启用 MLX Whisper
 MLX_WHISPER_AVAILABLE = False
@@ -36,26 +44,57 @@ _transcribers = {
     TranscriberType.BCUT: None,
     TranscriberType.KUAISHOU: None,
     TranscriberType.GROQ: None,
+    TranscriberType.AUTO: None,
 }
 
+# 每个实例一把初始化锁：后台预热与任务同时请求同一转录器时，后到者等待加载完成，不会重复下载/加载模型
+_init_locks = {}
+_init_locks_guard = threading.Lock()
+
 # 公共实例初始化函数
-def _init_transcriber(key: TranscriberType, cls, *args, **kwargs):
-    if _transcribers[key] is None:
-        logger.info(f'创建 {cls.__name__} 实例: {key}')
-        try:
-            _transcribers[key] = cls(*args, **kwargs)
-            logger.info(f'{cls.__name__} 创建成功')
-        except Exception as e:
-            logger.error(f"{cls.__name__} 创建失败: {e}")
-            raise
+def _init_transcriber(key, cls, *args, **kwargs):
+    if _transcribers.get(key) is not None:
+        return _transcribers[key]
+    with _init_locks_guard:
+        lock = _init_locks.setdefault(key, threading.Lock())
+    with lock:
+        if _transcribers.get(key) is None:
+            logger.info(f'创建 {cls.__name__} 实例: {key}')
+            try:
+                _transcribers[key] = cls(*args, **kwargs)
+                logger.info(f'{cls.__name__} 创建成功')
+            except Exception as e:
+                logger.error(f"{cls.__name__} 创建失败: {e}")
+                raise
     return _transcribers[key]
 
 # 各类型获取方法
 def get_groq_transcriber():
     return _init_transcriber(TranscriberType.GROQ, GroqTranscriber)
 
-def get_whisper_transcriber(model_size="base", device="cuda"):
-    return _init_transcriber(TranscriberType.FAST_WHISPER, WhisperTranscriber, model_size=model_size, device=device)
+def get_whisper_transcriber(model_size="base", device="cuda", profile=None):
+    whisper_profile = get_whisper_profile(profile)
+    # 在 CPU 上运行且未手动配置时，使用本机校准结果（见 whisper_tuning）
+    tuned = None
+    if device == "cpu" or not is_cuda_available():
+        tuned = get_tuned_config(model_size)
+    # worker 数与每个 worker 的线程数；默认单 worker 用满全部核心
+    if tuned and not os.environ.get("WHISPER_NUM_WORKERS") and not os.environ.get("WHISPER_CPU_THREADS"):
+        num_workers, cpu_threads = tuned["num_workers"], tuned["cpu_threads"]
+    else:
+        num_workers = max(1, int(os.environ.get("WHISPER_NUM_WORKERS") or 1))
+        cpu_threads = int(os.environ.get("WHISPER_CPU_THREADS") or 0) or max(1, (os.cpu_count() or 1) // num_workers)
+    # 预设或 WHISPER_COMPUTE_TYPE 指定了精度时以其为准
+    compute_type = tuned["compute_type"] if tuned and not whisper_profile.compute_type else None
+    if tuned:
+        logger.info(f"使用本机校准配置：{compute_type or whisper_profile.compute_type}，"
+                    f"workers={num_workers}，threads={cpu_threads}")
+    # 默认预设占用 FAST_WHISPER 槽位，其他预设单独缓存；加载参数相同的预设共享同一个模型实例
+    key = TranscriberType.FAST_WHISPER
+    if whisper_profile != get_whisper_profile():
+        key = (TranscriberType.FAST_WHISPER, whisper_profile.name)
+    return _init_transcriber(key, WhisperTranscriber, model_size=model_size, device=device,
+                             compute_type=compute_type, cpu_threads=cpu_threads, num_workers=num_workers, profile=whisper_profile)
 
 def get_bcut_transcriber():
     return _init_transcriber(TranscriberType.BCUT, BcutTranscriber)
@@ -69,15 +108,37 @@ def get_mlx_whisper_transcriber(model_size="base"):
         raise ImportError("MLX Whisper 不可用")
     return _init_transcriber(TranscriberType.MLX_WHISPER, MLXWhisperTranscriber, model_size=model_size)
 
+def get_routing_transcriber(model_size="base", device="cuda"):
+    """
+    自动路由：在 TRANSCRIBER_ROUTES 列出的后端之间按耗时与失败率选择，失败时回退
+    """
+    factories = {
+        TranscriberType.FAST_WHISPER.value: lambda: get_whisper_transcriber(model_size, device=device),
+        TranscriberType.MLX_WHISPER.value: lambda: get_mlx_whisper_transcriber(model_size),
+        TranscriberType.BCUT.value: get_bcut_transcriber,
+        TranscriberType.KUAISHOU.value: get_kuaishou_transcriber,
+        TranscriberType.GROQ.value: get_groq_transcriber,
+    }
+    routes = os.environ.get("TRANSCRIBER_ROUTES", "fast-whisper,bcut,kuaishou,groq")
+    backends = {}
+    for name in (item.strip() for item in routes.split(",")):
+        if name in factories:
+            backends[name] = factories[name]
+        elif name:
+            logger.warning(f'TRANSCRIBER_ROUTES 中的未知后端 "{name}" 已忽略')
+    return _init_transcriber(TranscriberType.AUTO, RoutingTranscriber, backends=backends)
+
 # 通用入口
-def get_transcriber(transcriber_type="fast-whisper", model_size="base", device="cuda"):
+def get_transcriber(transcriber_type="fast-whisper", model_size="base", device="cuda", profile=None):
     """
     获取指定类型的转录器实例
 
     参数:
-        transcriber_type: 支持 "fast-whisper", "mlx-whisper", "bcut", "kuaishou", "groq"
+        transcriber_type: 支持 "fast-whisper", "mlx-whisper", "bcut", "kuaishou", "groq", "auto"（自动路由）
         model_size: 模型大小，适用于 whisper 类
         device: 设备类型（如 cuda / cpu），仅 whisper 使用
+        profile: fast-whisper 推理参数预设（fast / balanced / accurate），为空时使用 WHISPER_PROFILE；
+                 auto 模式下指定预设即表示使用 fast-whisper，不再自动路由
 
     返回:
         对应类型的转录器实例
@@ -93,12 +154,12 @@ def get_transcriber(transcriber_type="fast-whisper", model_size="base", device="
     whisper_model_size = os.environ.get("WHISPER_MODEL_SIZE", model_size)
 
     if transcriber_enum == TranscriberType.FAST_WHISPER:
-        return get_whisper_transcriber(whisper_model_size, device=device)
+        return get_whisper_transcriber(whisper_model_size, device=device, profile=profile)
 
     elif transcriber_enum == TranscriberType.MLX_WHISPER:
         if not MLX_WHISPER_AVAILABLE:
             logger.warning("MLX Whisper 不可用，回退到 fast-whisper")
-            return get_whisper_transcriber(whisper_model_size, device=device)
+            return get_whisper_transcriber(whisper_model_size, device=device, profile=profile)
         return get_mlx_whisper_transcriber(whisper_model_size)
 
     elif transcriber_enum == TranscriberType.BCUT:
@@ -110,6 +171,80 @@ def get_transcriber(transcriber_type="fast-whisper", model_size="base", device="
     elif transcriber_enum == TranscriberType.GROQ:
         return get_groq_transcriber()
 
+    elif transcriber_enum == TranscriberType.AUTO:
+        # 请求显式指定了 fast-whisper 预设时直接使用该预设，不参与自动路由，避免被其他后端覆盖
+        if profile:
+            logger.info(f'请求指定了 fast-whisper 预设 "{profile}"，跳过自动路由')
+            return get_whisper_transcriber(whisper_model_size, device=device, profile=profile)
+        return get_routing_transcriber(whisper_model_size, device=device)
+
     # fallback
     logger.warning(f'未识别转录器类型 "{transcriber_type}"，使用 fast-whisper 作为默认')
-    return get_whisper_transcriber(whisper_model_size, device=device)
+    return get_whisper_transcriber(whisper_model_size, device=device, profile=profile)
+
+
+# ---------------- 后台预热 ----------------
+
+# 预热状态：idle（未预热）/ loading / ready / failed
+_warmup_state = {
+    "status": "idle",
+    "transcriber_type": None,
+    "error": None,
+    "started_at": None,
+    "finished_at": None,
+}
+_warmup_lock = threading.Lock()
+# 未启动预热时视为就绪，任务按需加载转录器
+_warmup_done = threading.Event()
+_warmup_done.set()
+
+
+def warm_up_transcriber(transcriber_type="fast-whisper") -> None:
+    """
+    在后台线程中创建（必要时下载并加载）转录器，不阻塞服务启动。
+    自动路由时同时预热所有已配置的后端。
+    """
+    with _warmup_lock:
+        if _warmup_state["status"] in ("loading", "ready"):
+            return
+        _warmup_state.update(status="loading", transcriber_type=transcriber_type, error=None,
+                             started_at=time.time(), finished_at=None)
+        _warmup_done.clear()
+
+    def run():
+        try:
+            transcriber = get_transcriber(transcriber_type=transcriber_type)
+            if isinstance(transcriber, RoutingTranscriber):
+                transcriber.warm_up()
+            status, error = "ready", None
+            logger.info(f"转录器预热完成：{transcriber_type}")
+        except Exception as e:
+            # 预热失败不影响服务，任务执行时会再次尝试创建并报告错误
+            status, error = "failed", str(e)
+            logger.error(f"转录器预热失败：{e}")
+        with _warmup_lock:
+            _warmup_state.update(status=status, error=error, finished_at=time.time())
+        _warmup_done.set()
+
+    threading.Thread(target=run, name="transcriber-warmup", daemon=True).start()
+
+
+def wait_transcriber_ready(timeout: Optional[float] = None) -> bool:
+    """
+    等待预热结束（成功或失败）
+
+    :param timeout: 最长等待秒数，None 表示一直等待
+    :return: 预热是否已结束
+    """
+    return _warmup_done.wait(timeout)
+
+
+def get_warmup_status() -> dict:
+    """当前预热状态、已加载耗时（秒），以及是否可以开始执行任务（预热失败时任务执行时再尝试加载）"""
+    with _warmup_lock:
+        state = dict(_warmup_state)
+    if state["started_at"]:
+        end = state["finished_at"] or time.time()
+        state["elapsed"] = round(end - state["started_at"], 1)
+    state["ready"] = state["status"] != "loading"
+    return state
@@ -1,15 +1,22 @@
-from faster_whisper import WhisperModel
+from faster_whisper import BatchedInferencePipeline, WhisperModel, decode_audio
+from faster_whisper.vad import VadOptions, get_speech_timestamps
 
 from app.decorators.timeit import timeit
 from app.models.transcriber_model import TranscriptSegment, TranscriptResult
 from app.transcriber.base import Transcriber
+from app.transcriber.whisper_profiles import DEFAULT_WHISPER_PROFILE, WHISPER_PROFILES, WhisperProfile, get_whisper_profile
 from app.utils.env_checker import is_cuda_available, is_torch_installed
 from app.utils.logger import get_logger
 from app.utils.path_helper import get_model_dir
 
 from events import transcription_finished
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+import hashlib
 import os
+import threading
 from tqdm import tqdm
 from modelscope import snapshot_download
 
@@ -30,15 +37,93 @@ MODEL_MAP={
     'large-v3-turbo':'pengzhendong/faster-whisper-large-v3-turbo',
 }
 
+# 按静音切段并行转写（需 WHISPER_NUM_WORKERS > 1）
+WHISPER_PARALLEL_CHUNKS = os.getenv("WHISPER_PARALLEL_CHUNKS", "false").lower() in ("1", "true", "yes")
+# 每段的目标时长（秒），在不超过该时长的前提下尽量合并相邻语音
+WHISPER_CHUNK_SECONDS = int(os.getenv("WHISPER_CHUNK_SECONDS", 120))
+SAMPLING_RATE = 16000
+# 语言预检测只在开头这段时间内找语音（跳过片头音乐），取其中最多 30 秒语音检测一次
+LANGUAGE_DETECTION_WINDOW_SECONDS = 120
+
+
+def plan_chunks(speech: List[dict], max_samples: int) -> List[Tuple[int, int]]:
+    """
+    把 VAD 检测出的语音区间合并为若干段，段与段之间总在静音处断开
+
+    :param speech: get_speech_timestamps 的结果，[{"start": 采样点, "end": 采样点}, ...]
+    :param max_samples: 每段的目标最大长度（采样点），单个语音区间超长时独占一段
+    :return: [(起始采样点, 结束采样点), ...]
+    """
+    chunks = []
+    for region in speech:
+        if chunks and region["end"] - chunks[-1][0] <= max_samples:
+            chunks[-1] = (chunks[-1][0], region["end"])
+        else:
+            chunks.append((region["start"], region["end"]))
+    return chunks
+
+
+def ensure_model(model_size: str) -> str:
+    """返回本地模型目录，不存在时先下载"""
+    model_dir = get_model_dir("whisper")
+    model_path = os.path.join(model_dir, f"whisper-{model_size}")
+    if not Path(model_path).exists():
+        logger.info(f"模型 whisper-{model_size} 不存在，开始下载...")
+        repo_id = MODEL_MAP[model_size]
+        model_path = snapshot_download(
+            repo_id,
+
+            local_dir=model_path,
+        )
+        logger.info("模型下载完成")
+    return model_path
+
+
+# 模型实例按加载参数共享：(model_size, device, compute_type, cpu_threads, num_workers) -> (模型, 空闲 worker 计数)
+_models: Dict[tuple, Tuple[WhisperModel, threading.BoundedSemaphore]] = {}
+_models_lock = threading.Lock()
+
+
+def _load_model(model_size: str, device: str, compute_type: str, cpu_threads: int,
+                num_workers: int) -> Tuple[WhisperModel, threading.BoundedSemaphore]:
+    key = (model_size, device, compute_type, cpu_threads, num_workers)
+    with _models_lock:
+        if key in _models:
+            return _models[key]
+
+        model = WhisperModel(
+            model_size_or_path=ensure_model(model_size),
+            device=device,
+            compute_type=compute_type,
+            cpu_threads=cpu_threads,
+            num_workers=num_workers,
+            download_root=get_model_dir("whisper")
+        )
+        logger.info(f"Whisper 模型加载完成：{compute_type}，workers={num_workers}，每个 worker {cpu_threads} 线程")
+        # 空闲 worker 计数，超出 worker 数的任务在此排队
+        _models[key] = (model, threading.BoundedSemaphore(num_workers))
+        return _models[key]
+
+
 class WhisperTranscriber(Transcriber):
-    # TODO:修改为可配置
+    preferred_audio_format = "wav"
+    supports_language_hint = True
+
     def __init__(
             self,
             model_size: str = "base",
             device: str = 'cpu',
             compute_type: str = None,
             cpu_threads: int = 1,
+            num_workers: int = 1,
+            profile: Optional[WhisperProfile] = None,
     ):
+        """
+        :param cpu_threads: 每个 worker 使用的 CPU 线程数
+        :param num_workers: 模型的并行 worker 数（ctranslate2），多个任务可同时转写，
+                            CPU 上总占用约为 num_workers * cpu_threads 个核
+        :param profile: 推理参数预设（见 whisper_profiles），为空时使用 WHISPER_PROFILE
+        """
         if device == 'cpu' or device is None:
             self.device = 'cpu'
         else:
@@ -46,27 +131,27 @@ class WhisperTranscriber(Transcriber):
             if device == 'cuda' and self.device == 'cpu':
                 print('没有 cuda 使用 cpu进行计算')
 
-        self.compute_type = compute_type or ("float16" if self.device == "cuda" else "int8")
+        self.profile = profile or get_whisper_profile()
+        self.compute_type = compute_type or self.profile.compute_type or ("float16" if self.device == "cuda" else "int8")
+        self.model_size = model_size
+        self.num_workers = max(1, num_workers)
+        self.cpu_threads = self.profile.cpu_threads or cpu_threads
 
-        model_dir = get_model_dir("whisper")
-        model_path = os.path.join(model_dir, f"whisper-{model_size}")
-        if not Path(model_path).exists():
-            logger.info(f"模型 whisper-{model_size} 不存在，开始下载...")
-            repo_id = MODEL_MAP[model_size]
-            model_path = snapshot_download(
-                repo_id,
+        self.model, self._workers = _load_model(model_size, self.device, self.compute_type, self.cpu_threads,
+                                                self.num_workers)
+        self._batched = BatchedInferencePipeline(model=self.model) if self.profile.batch_size > 0 else None
 
-                local_dir=model_path,
-            )
-            logger.info("模型下载完成")
+    def cache_signature(self) -> str:
+        # 未经环境变量修改的默认预设沿用原有签名，保证已有转写缓存继续有效
+        default_compute_type = "float16" if self.device == "cuda" else "int8"
+        if self.profile == WHISPER_PROFILES[DEFAULT_WHISPER_PROFILE] and self.compute_type == default_compute_type:
+            return f"fast-whisper-{self.model_size}"
+        # 其余情况带上实际生效参数的哈希，WHISPER_BEAM_SIZE 等单项配置变化后不复用旧结果
+        params = (self.compute_type, self.profile.beam_size, self.profile.batch_size,
+                  self.profile.vad_filter, self.profile.language)
+        digest = hashlib.sha1(repr(params).encode("utf-8")).hexdigest()[:8]
+        return f"fast-whisper-{self.model_size}-{self.profile.name}-{digest}"
 
-        self.model = WhisperModel(
-            model_size_or_path=model_path,
-            device=self.device,
-            compute_type=self.compute_type,
-            cpu_threads=cpu_threads,
-            download_root=model_dir
-        )
     @staticmethod
     def is_torch_installed() -> bool:
         try:
@@ -92,34 +177,150 @@ class WhisperTranscriber(Transcriber):
             return False
 
     @timeit
-    def transcript(self, file_path: str) -> TranscriptResult:
+    def transcript(self, file_path: str, language: Optional[str] = None) -> TranscriptResult:
+        return self._transcribe(file_path, language=language)
+
+    @timeit
+    def transcript_stream(self, file_path: str, on_segment: Callable[[TranscriptSegment], None],
+                          language: Optional[str] = None) -> TranscriptResult:
+        return self._transcribe(file_path, on_segment=on_segment, language=language)
+
+    def _transcribe(self, file_path: str,
+                    on_segment: Optional[Callable[[TranscriptSegment], None]] = None,
+                    language: Optional[str] = None) -> TranscriptResult:
         try:
+            # 只解码一次，语言预检测、切段与转写共用同一份音频
+            audio = decode_audio(file_path, sampling_rate=SAMPLING_RATE)
+            language = self._resolve_language(audio, language, file_path)
 
-            segments_raw, info = self.model.transcribe(file_path)
-
-            segments = []
-            full_text = ""
-
-            for seg in segments_raw:
-                text = seg.text.strip()
-                full_text += text + " "
-                segments.append(TranscriptSegment(
-                    start=seg.start,
-                    end=seg.end,
-                    text=text
-                ))
-
-            result= TranscriptResult(
-                language=info.language,
-                full_text=full_text.strip(),
-                segments=segments,
-                raw=info
-            )
+            # 批量推理本身已并行，不再切段
+            if WHISPER_PARALLEL_CHUNKS and self.num_workers > 1 and self._batched is None:
+                result = self._transcribe_chunked(audio, file_path, language, on_segment=on_segment)
+                if result is not None:
+                    return result
+
+            with self._worker(file_path):
+                # faster-whisper 返回的是惰性生成器，每解码出一段就可以交给回调处理；
+                # 解码发生在迭代过程中，因此整个迭代期间都占用一个 worker
+                segments_raw, info = self._decode(audio, language=language)
+                segments = self._collect_segments(segments_raw, offset=0.0, on_segment=on_segment)
+
+            result = self._build_result(segments, info)
             # self.on_finish(file_path, result)
             return result
+        except Exception:
+            # 向上抛出，由路由转写器回退或由任务标记失败，不能返回 None 让调用方误以为成功
+            logger.exception(f"转写失败：{file_path}")
+            raise
+
+    def _transcribe_chunked(self, audio, file_path: str, language: Optional[str],
+                            on_segment: Optional[Callable[[TranscriptSegment], None]] = None) -> Optional[TranscriptResult]:
+        """
+        按 VAD 检测到的静音处把音频切成若干段，分发给多个 worker 并行转写，
+        再按偏移量还原绝对时间戳合并为一个结果。音频只有一段时返回 None，由调用方整段转写。
+        """
+        speech = get_speech_timestamps(audio, VadOptions(min_silence_duration_ms=1000))
+        chunks = plan_chunks(speech, WHISPER_CHUNK_SECONDS * SAMPLING_RATE)
+        if len(chunks) < 2:
+            return None
+        logger.info(f"音频按静音切分为 {len(chunks)} 段，使用 {self.num_workers} 个 worker 并行转写：{file_path}")
+
+        # 各段统一使用预检测的语言，避免逐段检测结果不一致
+        if not language:
+            first_start, first_end = chunks[0]
+            with self._worker(file_path):
+                language, _, _ = self.model.detect_language(audio[first_start:first_end])
+
+        def run(chunk):
+            start, end = chunk
+            with self._worker(file_path):
+                segments_raw, info = self._decode(audio[start:end], language=language)
+                return self._collect_segments(segments_raw, offset=start / SAMPLING_RATE), info
+
+        results = [None] * len(chunks)
+        next_index = 0
+        with ThreadPoolExecutor(max_workers=self.num_workers, thread_name_prefix="whisper-chunk") as executor:
+            futures = {executor.submit(run, chunk): i for i, chunk in enumerate(chunks)}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                # 片段回调按时间顺序触发：前面的段都完成后才推送后面的段
+                while next_index < len(results) and results[next_index] is not None:
+                    if on_segment:
+                        for segment in results[next_index][0]:
+                            on_segment(segment)
+                    next_index += 1
+
+        segments = [segment for chunk_segments, _ in results for segment in chunk_segments]
+        return self._build_result(segments, results[0][1])
+
+    def _resolve_language(self, audio, hint: Optional[str], file_path: str) -> Optional[str]:
+        """
+        确定整段转写使用的语言：预设/WHISPER_LANGUAGE > 平台元数据提供的语言 > 开头语音预检测。
+        预检测失败（如开头没有语音）时返回 None，由 faster-whisper 自行检测。
+        """
+        if self.profile.language:
+            return self.profile.language
+        if hint:
+            code = hint.strip().lower().replace("_", "-").split("-")[0]
+            if code in self.model.supported_languages:
+                logger.info(f"使用平台元数据中的语言：{code}")
+                return code
+            logger.info(f"元数据语言 {hint} 不受支持，改为预检测")
+        try:
+            with self._worker(file_path):
+                # 只检测开头窗口内的前 30 秒语音，VAD 跳过片头音乐与静音
+                language, probability, _ = self.model.detect_language(
+                    audio[:LANGUAGE_DETECTION_WINDOW_SECONDS * SAMPLING_RATE], vad_filter=True)
         except Exception as e:
-            print(f"转写失败：{e}")
+            logger.warning(f"语言预检测失败，由转写时自动检测：{e}")
+            return None
+        logger.info(f"语言预检测结果：{language}（置信度 {probability:.2f}），整段转写固定使用该语言")
+        return language
+
+    def _decode(self, audio, language: Optional[str] = None):
+        # 按预设选择普通推理或批量推理
+        profile = self.profile
+        language = language or profile.language
+        if self._batched is not None:
+            return self._batched.transcribe(audio, language=language, beam_size=profile.beam_size,
+                                            batch_size=profile.batch_size)
+        return self.model.transcribe(audio, language=language, beam_size=profile.beam_size,
+                                     vad_filter=profile.vad_filter)
+
+    @contextmanager
+    def _worker(self, file_path: str):
+        # 占用一个空闲 worker，全部在忙时排队等待
+        if not self._workers.acquire(blocking=False):
+            logger.info(f"Whisper worker 均在忙，等待空闲 worker：{file_path}")
+            self._workers.acquire()
+        try:
+            yield
+        finally:
+            self._workers.release()
 
+    @staticmethod
+    def _collect_segments(segments_raw, offset: float,
+                          on_segment: Optional[Callable[[TranscriptSegment], None]] = None) -> List[TranscriptSegment]:
+        segments = []
+        for seg in segments_raw:
+            segment = TranscriptSegment(
+                start=seg.start + offset,
+                end=seg.end + offset,
+                text=seg.text.strip()
+            )
+            segments.append(segment)
+            if on_segment:
+                on_segment(segment)
+        return segments
+
+    @staticmethod
+    def _build_result(segments: List[TranscriptSegment], info) -> TranscriptResult:
+        return TranscriptResult(
+            language=info.language,
+            full_text=" ".join(segment.text for segment in segments).strip(),
+            segments=segments,
+            raw=info
+        )
 
     def on_finish(self,video_path:str,result: TranscriptResult)->None:
         print("转写完成")
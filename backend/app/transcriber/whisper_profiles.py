@@ -0,0 +1,72 @@
+import os
+from dataclasses import dataclass, replace
+from typing import Optional
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class WhisperProfile:
+    """
+    fast-whisper 的推理参数组合。加载参数（compute_type、cpu_threads）决定模型实例，
+    解码参数（beam_size、batch_size、vad_filter、language）在每次转写时生效。
+    """
+    name: str
+    compute_type: Optional[str] = None  # None 时 GPU 用 float16，CPU 用 int8
+    cpu_threads: Optional[int] = None  # None 时沿用 WHISPER_CPU_THREADS
+    beam_size: int = 5
+    batch_size: int = 0  # 大于 0 时使用 BatchedInferencePipeline 批量推理（强制开启 VAD）
+    vad_filter: bool = False
+    language: Optional[str] = None  # None 时自动检测
+
+
+WHISPER_PROFILES = {
+    # 批量任务：贪心解码 + 批量推理，吞吐优先；计算精度沿用设备默认值（GPU 上不强制 int8）
+    "fast": WhisperProfile(name="fast", beam_size=1, batch_size=16, vad_filter=True),
+    # 默认：与原有行为一致
+    "balanced": WhisperProfile(name="balanced"),
+    # 精度优先：全精度计算
+    "accurate": WhisperProfile(name="accurate", compute_type="float32", beam_size=5),
+}
+
+DEFAULT_WHISPER_PROFILE = "balanced"
+
+
+def _env_overrides(profile: WhisperProfile) -> WhisperProfile:
+    # 环境变量中单独配置的参数覆盖默认预设
+    overrides = {}
+    if os.getenv("WHISPER_COMPUTE_TYPE"):
+        overrides["compute_type"] = os.getenv("WHISPER_COMPUTE_TYPE")
+    if os.getenv("WHISPER_BEAM_SIZE"):
+        overrides["beam_size"] = int(os.getenv("WHISPER_BEAM_SIZE"))
+    if os.getenv("WHISPER_BATCH_SIZE"):
+        overrides["batch_size"] = int(os.getenv("WHISPER_BATCH_SIZE"))
+    if os.getenv("WHISPER_VAD_FILTER"):
+        overrides["vad_filter"] = os.getenv("WHISPER_VAD_FILTER").lower() in ("1", "true", "yes")
+    if os.getenv("WHISPER_LANGUAGE"):
+        overrides["language"] = os.getenv("WHISPER_LANGUAGE")
+    return replace(profile, **overrides) if overrides else profile
+
+
+def get_whisper_profile(name: Optional[str] = None) -> WhisperProfile:
+    """
+    获取推理参数预设
+
+    :param name: 预设名（fast / balanced / accurate），为空时使用 WHISPER_PROFILE，
+                 该默认预设会再叠加 WHISPER_BEAM_SIZE 等单项环境变量
+    :return: WhisperProfile
+    """
+    default_name = os.getenv("WHISPER_PROFILE", DEFAULT_WHISPER_PROFILE)
+    if default_name not in WHISPER_PROFILES:
+        logger.warning(f"未知的 WHISPER_PROFILE：{default_name}，使用 {DEFAULT_WHISPER_PROFILE}")
+        default_name = DEFAULT_WHISPER_PROFILE
+
+    name = name or default_name
+    if name not in WHISPER_PROFILES:
+        logger.warning(f"未知的转写预设：{name}，使用 {default_name}")
+        name = default_name
+
+    profile = WHISPER_PROFILES[name]
+    return _env_overrides(profile) if name == default_name else profile
@@ -0,0 +1,232 @@
+import argparse
+import json
+import os
+import platform
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+from faster_whisper import WhisperModel, decode_audio
+
+from app.transcriber.whisper import SAMPLING_RATE, ensure_model
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 校准结果按 模型大小 保存，并记录主机特征，换机器（或容器 CPU 配额变化）后自动失效
+TUNING_PATH = Path("config/whisper_tuning.json")
+
+# 候选的计算精度，实际只测试 ctranslate2 在本机 CPU 上支持的类型
+CANDIDATE_COMPUTE_TYPES = ("int8", "int16", "float32")
+# 候选的并行 worker 数
+CANDIDATE_WORKERS = (1, 2, 4)
+DEFAULT_CLIP_SECONDS = 30
+
+_file_lock = threading.Lock()
+
+
+def host_fingerprint() -> dict:
+    """本机 CPU 特征，用于判断校准结果是否适用于当前机器"""
+    cpu_model = platform.processor()
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    cpu_model = line.split(":", 1)[1].strip()
+                    break
+    except OSError:
+        pass
+    # 不包含主机名：容器每次部署主机名都会变化
+    return {
+        "machine": platform.machine(),
+        "cpu": cpu_model,
+        "cpu_count": os.cpu_count() or 1,
+    }
+
+
+def _read() -> dict:
+    try:
+        with TUNING_PATH.open("r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def _write(data: dict) -> None:
+    TUNING_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with TUNING_PATH.open("w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def get_tuned_config(model_size: str) -> Optional[dict]:
+    """
+    读取本机的校准结果
+
+    :return: {"compute_type", "cpu_threads", "num_workers", "rtf", ...}；未校准或不是在本机校准时返回 None
+    """
+    with _file_lock:
+        tuned = _read().get(model_size)
+    if not tuned or tuned.get("host") != host_fingerprint():
+        return None
+    return tuned
+
+
+def candidate_layouts(cpu_count: int) -> List[Tuple[int, int]]:
+    """(num_workers, cpu_threads) 候选组合：总线程数用满全部核心，另加单 worker 只用一半核心（超线程机器上往往更快）"""
+    layouts = [(workers, max(1, cpu_count // workers)) for workers in CANDIDATE_WORKERS if workers <= cpu_count]
+    layouts.append((1, max(1, cpu_count // 2)))
+    return list(dict.fromkeys(layouts))
+
+
+def synthetic_clip(seconds: int) -> np.ndarray:
+    """
+    生成类语音的合成音频：带谐波的基频按音节节奏起伏，中间穿插停顿。
+    没有可用的真实音频时使用，解码负载比真实语音低，结果仅供参考。
+    """
+    rng = np.random.default_rng(0)
+    t = np.arange(seconds * SAMPLING_RATE) / SAMPLING_RATE
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLING_RATE
+    voice = sum(np.sin(k * phase) / k for k in range(1, 6))
+    # 约 4 个音节/秒，每 3 秒停顿 0.5 秒
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) * (t % 3 < 2.5)
+    audio = 0.3 * voice * envelope + 0.01 * rng.standard_normal(t.shape)
+    return audio.astype(np.float32)
+
+
+def _measure(model_path: str, compute_type: str, num_workers: int, cpu_threads: int,
+             audio: np.ndarray) -> float:
+    """加载模型并让每个 worker 同时转写一遍样本，返回实时率（耗时 / 音频总时长，越小越快）"""
+    model = WhisperModel(model_path, device="cpu", compute_type=compute_type,
+                         cpu_threads=cpu_threads, num_workers=num_workers)
+    try:
+        def run(clip):
+            segments, _ = model.transcribe(clip, beam_size=5)
+            # 转写结果是惰性生成器，需要完整迭代才会真正解码
+            for _ in segments:
+                pass
+
+        # 预热一次，排除首次推理的初始化开销
+        run(audio[:5 * SAMPLING_RATE])
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            list(executor.map(run, [audio] * num_workers))
+        elapsed = time.perf_counter() - started
+    finally:
+        del model
+    return elapsed / (num_workers * len(audio) / SAMPLING_RATE)
+
+
+def calibrate(model_size: str = "base", audio_path: Optional[str] = None,
+              clip_seconds: int = DEFAULT_CLIP_SECONDS, on_progress=None) -> dict:
+    """
+    在本机 CPU 上测试各 compute_type 与 cpu_threads/num_workers 组合的实时率，
+    把最快的组合写入 config/whisper_tuning.json，之后 get_whisper_transcriber 自动使用。
+
+    校准期间会占满 CPU，应在没有转写任务时运行。
+
+    :param model_size: 模型大小
+    :param audio_path: 样本音频，只取前 clip_seconds 秒；为空时使用合成音频
+    :param clip_seconds: 样本时长（秒）
+    :param on_progress: 每测完一个组合调用 on_progress(已完成数, 总数)
+    :return: 保存的校准结果
+    """
+    import ctranslate2
+
+    if audio_path:
+        audio = decode_audio(audio_path, sampling_rate=SAMPLING_RATE)[:clip_seconds * SAMPLING_RATE]
+    else:
+        audio = synthetic_clip(clip_seconds)
+    model_path = ensure_model(model_size)
+
+    supported = ctranslate2.get_supported_compute_types("cpu")
+    compute_types = [compute_type for compute_type in CANDIDATE_COMPUTE_TYPES if compute_type in supported]
+    host = host_fingerprint()
+    combos = [(compute_type, workers, threads)
+              for compute_type in compute_types
+              for workers, threads in candidate_layouts(host["cpu_count"])]
+
+    results = []
+    for i, (compute_type, workers, threads) in enumerate(combos):
+        try:
+            rtf = _measure(model_path, compute_type, workers, threads, audio)
+            logger.info(f"校准 {compute_type} workers={workers} threads={threads}：实时率 {rtf:.3f}")
+            results.append({"compute_type": compute_type, "num_workers": workers, "cpu_threads": threads,
+                            "rtf": round(rtf, 4)})
+        except Exception as e:
+            logger.warning(f"校准 {compute_type} workers={workers} threads={threads} 失败：{e}")
+        if on_progress:
+            on_progress(i + 1, len(combos))
+
+    if not results:
+        raise RuntimeError("所有候选配置均测试失败")
+
+    best = min(results, key=lambda item: item["rtf"])
+    tuned = {
+        **best,
+        "host": host,
+        "sample": audio_path or "synthetic",
+        "clip_seconds": round(len(audio) / SAMPLING_RATE, 1),
+        "calibrated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "results": sorted(results, key=lambda item: item["rtf"]),
+    }
+    with _file_lock:
+        data = _read()
+        data[model_size] = tuned
+        _write(data)
+    logger.info(f"校准完成，最快配置：{best}")
+    return tuned
+
+
+# ---------------- 后台校准（供接口调用） ----------------
+
+_calibration_state = {"status": "idle", "model_size": None, "progress": 0, "error": None}
+_calibration_lock = threading.Lock()
+
+
+def start_calibration(model_size: str = "base", audio_path: Optional[str] = None,
+                      clip_seconds: int = DEFAULT_CLIP_SECONDS) -> bool:
+    """在后台线程中校准，已有校准在进行时返回 False"""
+    with _calibration_lock:
+        if _calibration_state["status"] == "running":
+            return False
+        _calibration_state.update(status="running", model_size=model_size, progress=0, error=None)
+
+    def on_progress(done: int, total: int):
+        with _calibration_lock:
+            _calibration_state["progress"] = int(done * 100 / total)
+
+    def run():
+        try:
+            calibrate(model_size, audio_path=audio_path, clip_seconds=clip_seconds, on_progress=on_progress)
+            status, error = "done", None
+        except Exception as e:
+            logger.error(f"Whisper 校准失败：{e}")
+            status, error = "failed", str(e)
+        with _calibration_lock:
+            _calibration_state.update(status=status, error=error)
+
+    threading.Thread(target=run, name="whisper-calibration", daemon=True).start()
+    return True
+
+
+def get_calibration_status(model_size: str = "base") -> dict:
+    with _calibration_lock:
+        state = dict(_calibration_state)
+    state["tuned"] = get_tuned_config(model_size)
+    return state
+
+
+if __name__ == "__main__":
+    # python -m app.transcriber.whisper_tuning --model-size base [--audio sample.wav]
+    parser = argparse.ArgumentParser(description="测试本机 CPU 上 faster-whisper 的最快配置")
+    parser.add_argument("--model-size", default=os.getenv("WHISPER_MODEL_SIZE", "base"))
+    parser.add_argument("--audio", default=None, help="样本音频，默认使用合成音频")
+    parser.add_argument("--seconds", type=int, default=DEFAULT_CLIP_SECONDS, help="样本时长（秒）")
+    args = parser.parse_args()
+
+    result = calibrate(args.model_size, audio_path=args.audio, clip_seconds=args.seconds)
+    print(json.dumps({key: value for key, value in result.items() if key != "host"}, ensure_ascii=False, indent=2))
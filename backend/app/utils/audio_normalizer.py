@@ -0,0 +1,72 @@
+import os
+import subprocess
+import threading
+from typing import Optional
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 是否在转写前统一转换音频格式
+AUDIO_NORMALIZE_ENABLED = os.getenv("AUDIO_NORMALIZE", "true").lower() in ("1", "true", "yes")
+
+# 目标格式 -> (扩展名, ffmpeg 编码参数)，统一 16kHz 单声道（ASR 模型的输入采样率）
+AUDIO_FORMATS = {
+    # 本地 Whisper：无损 PCM，省去转写时的解码与重采样
+    "wav": ("wav", ["-c:a", "pcm_s16le"]),
+    # 远程接口：无损压缩，体积约为 PCM 的一半
+    "flac": ("flac", ["-c:a", "flac"]),
+    # 远程接口：只接受 mp3 时使用低码率 mp3
+    "mp3": ("mp3", ["-c:a", "libmp3lame", "-b:a", "32k"]),
+    "opus": ("ogg", ["-c:a", "libopus", "-b:a", "24k"]),
+}
+
+_lock = threading.Lock()
+
+
+def normalize_audio(file_path: str, audio_format: Optional[str]) -> str:
+    """
+    把下载得到的任意音视频文件转换为转写器偏好的格式（16kHz 单声道），
+    结果保存在源文件旁（{name}.16k.{ext}），已存在且不旧于源文件时直接复用。
+
+    :param file_path: 源文件路径
+    :param audio_format: 目标格式（见 AUDIO_FORMATS），为空时不转换
+    :return: 转换后的文件路径；未启用、格式未知或转换失败时返回源文件路径
+    """
+    if not AUDIO_NORMALIZE_ENABLED or not audio_format or not file_path:
+        return file_path
+    if audio_format not in AUDIO_FORMATS:
+        logger.warning(f"未知的音频格式：{audio_format}，跳过转换")
+        return file_path
+
+    ext, codec_args = AUDIO_FORMATS[audio_format]
+    base, _ = os.path.splitext(file_path)
+    output_path = f"{base}.16k.{ext}"
+    if output_path == file_path:
+        return file_path
+
+    with _lock:
+        if os.path.exists(output_path) and os.path.getmtime(output_path) >= os.path.getmtime(file_path):
+            logger.info(f"复用已转换的音频：{output_path}")
+            return output_path
+
+    temp_path = f"{base}.16k.{os.getpid()}.{threading.get_ident()}.tmp.{ext}"
+    command = [
+        "ffmpeg", "-y", "-i", file_path,
+        "-vn", "-ar", "16000", "-ac", "1",
+        *codec_args,
+        temp_path,
+    ]
+    try:
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
+        os.replace(temp_path, output_path)
+    except (OSError, subprocess.CalledProcessError) as e:
+        stderr = getattr(e, "stderr", b"") or b""
+        logger.warning(f"音频格式转换失败，使用原文件转写：{e} {stderr.decode(errors='ignore')[-300:]}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return file_path
+
+    logger.info(f"音频已转换为 {audio_format} 16kHz 单声道：{os.path.getsize(file_path) // 1024}KB -> "
+                f"{os.path.getsize(output_path) // 1024}KB")
+    return output_path
@@ -0,0 +1,33 @@
+import os
+import threading
+from typing import Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# 每个主机保留的最大连接数，应不小于同时进行的远程请求数（如 bcut 分片并发上传数）
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 16))
+
+_sessions: Dict[str, requests.Session] = {}
+_lock = threading.Lock()
+
+
+def get_session(name: str) -> requests.Session:
+    """
+    获取进程内共享的 requests.Session，复用 TCP/TLS 连接
+
+    Session 只用于连接复用，不应在其上保存与某次任务相关的状态（cookie、headers 等），
+    各任务的请求头等参数在每次请求时单独传入。
+
+    :param name: 会话名，不同服务使用不同的连接池
+    :return: requests.Session
+    """
+    with _lock:
+        session = _sessions.get(name)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[name] = session
+        return session
@@ -20,6 +20,21 @@ def is_supported_video_url(url: str) -> bool:
     return False
 
 
+# 批量生成时额外允许的列表类链接（播放列表等），单个视频接口不接受
+SUPPORTED_PLAYLISTS = {
+    "youtube": r"(https?://)?(www\.)?youtube\.com/playlist\?list=[\w\-]+",
+    # UP 主空间中的合集与视频列表（多P 视频使用普通视频链接，已被单个视频规则接受）
+    "bilibili": r"(https?://)?space\.bilibili\.com/\d+/"
+                r"(channel/(collectiondetail|seriesdetail)/?\?([^#]*&)?sid=\d+|lists/\d+)",
+}
+
+
+def is_supported_batch_url(url: str) -> bool:
+    if is_supported_video_url(url):
+        return True
+    return any(re.match(pattern, url) for pattern in SUPPORTED_PLAYLISTS.values())
+
+
 class VideoRequest(BaseModel):
     url: AnyUrl
     platform: str
@@ -10,7 +10,11 @@ from app.db.provider_dao import init_provider_table
 from app.utils.logger import get_logger
 from app import create_app
 from app.db.video_task_dao import init_video_task_table
-from app.transcriber.transcriber_provider import get_transcriber
+from app.db.note_job_dao import init_note_job_table
+from app.db.note_batch_dao import init_note_batch_table
+from app.db.llm_cache_dao import init_llm_cache_table
+from app.routers.note import note_task_queue
+from app.transcriber.transcriber_provider import warm_up_transcriber
 from events import register_handler
 from ffmpeg_helper import ensure_ffmpeg_or_raise
 
@@ -43,10 +47,15 @@ async def startup_event():
 
     register_handler()
     ensure_ffmpeg_or_raise()
-    get_transcriber(transcriber_type=os.getenv("TRANSCRIBER_TYPE","fast-whisper"))
+    # 模型下载/加载在后台进行，服务立即可用；预热完成前提交的任务在队列中等待
+    warm_up_transcriber(transcriber_type=os.getenv("TRANSCRIBER_TYPE","fast-whisper"))
     init_video_task_table()
     init_provider_table()
     init_model_table()
+    init_note_job_table()
+    init_note_batch_table()
+    init_llm_cache_table()
+    note_task_queue.start()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,20 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# 应用模块导入时会在当前目录下创建 logs/、config/、note_results/ 以及 bili_note.db，
+# 测试统一在临时目录中运行，避免污染工作区
+os.chdir(tempfile.mkdtemp(prefix="bilinote-tests-"))
+
+
+@pytest.fixture
+def sqlite_dir(tmp_path, monkeypatch):
+    """get_connection() 使用当前目录下的 bili_note.db，切换到临时目录获得一个空数据库"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,145 @@
+import pytest
+
+from app.models.audio_model import AudioDownloadResult
+from app.models.transcriber_model import TranscriptResult, TranscriptSegment
+from app.services import note as note_module
+from app.services.artifact_cache import ArtifactCache
+from app.services.note import NoteGenerator
+from app.transcriber.base import Transcriber
+
+
+class FileContentTranscriber(Transcriber):
+    """把音频文件内容当作转写文本返回，并记录调用次数"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def transcript(self, file_path: str) -> TranscriptResult:
+        self.calls += 1
+        with open(file_path, encoding="utf-8") as f:
+            text = f.read()
+        return TranscriptResult(language="zh", full_text=text,
+                                segments=[TranscriptSegment(start=0, end=1, text=text)])
+
+
+def _transcript(text: str) -> TranscriptResult:
+    return TranscriptResult(language="zh", full_text=text, segments=[TranscriptSegment(start=0, end=1, text=text)])
+
+
+def _audio_meta(file_path, platform="local", video_id="meeting") -> AudioDownloadResult:
+    return AudioDownloadResult(file_path=str(file_path), title=video_id, duration=0, cover_url=None,
+                               platform=platform, video_id=video_id, raw_info={})
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = ArtifactCache(str(tmp_path / "artifacts"))
+    monkeypatch.setattr(note_module, "artifact_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def generator():
+    # 转写器在 generate() 中才创建，这里直接换成测试用的转写器
+    generator = NoteGenerator()
+    generator.transcriber = FileContentTranscriber()
+    return generator
+
+
+def test_transcript_keyed_by_platform_video_quality_and_signature(cache):
+    cache.save_transcript("bilibili", "BV1xx", "medium", "fast-whisper-base", _transcript("hello"))
+
+    assert cache.load_transcript("bilibili", "BV1xx", "medium", "fast-whisper-base").full_text == "hello"
+    assert cache.load_transcript("bilibili", "BV1xx", "fast", "fast-whisper-base") is None
+    assert cache.load_transcript("bilibili", "BV1xx", "medium", "fast-whisper-small") is None
+    assert cache.load_transcript("youtube", "BV1xx", "medium", "fast-whisper-base") is None
+
+
+def test_fingerprint_follows_file_content(cache, tmp_path):
+    first = tmp_path / "a.wav"
+    second = tmp_path / "b.wav"
+    first.write_bytes(b"same audio")
+    second.write_bytes(b"same audio")
+
+    assert cache.fingerprint(str(first)) == cache.fingerprint(str(second))
+    assert cache.fingerprint(str(tmp_path / "missing.wav")) is None
+
+    second.write_bytes(b"other audio")
+    assert cache.fingerprint(str(first)) != cache.fingerprint(str(second))
+
+
+def test_transcript_by_hash_roundtrip(cache):
+    cache.save_transcript_by_hash("ab" * 32, "Groq", _transcript("hi"))
+
+    assert cache.load_transcript_by_hash("ab" * 32, "Groq").full_text == "hi"
+    assert cache.load_transcript_by_hash("ab" * 32, "fast-whisper-base") is None
+
+
+def test_local_uploads_with_same_name_are_not_shared(cache, generator, tmp_path):
+    upload = tmp_path / "uploads" / "meeting.txt"
+    upload.parent.mkdir()
+
+    # /upload 会覆盖同名文件：第二次上传的内容不同，必须重新转写
+    upload.write_text("first recording", encoding="utf-8")
+    first = generator._transcribe_audio(_audio_meta(upload), "medium", None, None, None)
+    upload.write_text("second recording", encoding="utf-8")
+    second = generator._transcribe_audio(_audio_meta(upload), "medium", None, None, None)
+
+    assert first.full_text == "first recording"
+    assert second.full_text == "second recording"
+    assert generator.transcriber.calls == 2
+
+
+def test_local_upload_reuses_transcript_of_same_content(cache, generator, tmp_path):
+    first = tmp_path / "a.txt"
+    second = tmp_path / "renamed.txt"
+    first.write_text("same recording", encoding="utf-8")
+    second.write_text("same recording", encoding="utf-8")
+
+    generator._transcribe_audio(_audio_meta(first, video_id="a"), "medium", None, None, None)
+    result = generator._transcribe_audio(_audio_meta(second, video_id="renamed"), "medium", None, None, None)
+
+    assert result.full_text == "same recording"
+    assert generator.transcriber.calls == 1
+
+
+def test_remote_video_hits_id_cache_before_transcribing(cache, generator, tmp_path):
+    audio = tmp_path / "BV1xx.txt"
+    audio.write_text("remote audio", encoding="utf-8")
+    cache.save_transcript("bilibili", "BV1xx", "medium", generator.transcriber.cache_signature(),
+                          _transcript("cached"))
+
+    result = generator._transcribe_audio(_audio_meta(audio, "bilibili", "BV1xx"), "medium", None, "BV1xx", None)
+
+    assert result.full_text == "cached"
+    assert generator.transcriber.calls == 0
+
+
+def test_concurrent_writes_to_same_entry_never_leave_partial_files(cache):
+    import threading
+
+    texts = [f"transcript {i} " * 2000 for i in range(8)]
+
+    def write(text):
+        for _ in range(5):
+            cache.save_transcript("bilibili", "BV1xx", "medium", "sig", _transcript(text))
+
+    threads = [threading.Thread(target=write, args=(text,)) for text in texts]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert cache.load_transcript("bilibili", "BV1xx", "medium", "sig").full_text in texts
+    assert not list(cache.entry_dir("bilibili", "BV1xx").glob("*.tmp"))
+
+
+def test_fingerprint_cache_is_bounded(cache, tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "MAX_FINGERPRINTS", 3)
+    for i in range(5):
+        audio = tmp_path / f"{i}.wav"
+        audio.write_bytes(str(i).encode())
+        cache.fingerprint(str(audio))
+
+    assert len(cache._fingerprints) == 3
+    assert [key[0] for key in cache._fingerprints] == [str(tmp_path / f"{i}.wav") for i in (2, 3, 4)]
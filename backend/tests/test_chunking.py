@@ -0,0 +1,27 @@
+from app.gpt.chunking import estimate_tokens, split_segments
+from app.models.transcriber_model import TranscriptSegment
+
+
+def seg(start, end, text):
+    return TranscriptSegment(start=start, end=end, text=text)
+
+
+def test_estimate_tokens_counts_cjk_and_latin():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("缓存设计") >= 2
+    assert estimate_tokens("word " * 100) > estimate_tokens("word " * 10)
+
+
+def test_split_segments_respects_budget_and_prefers_pauses():
+    segments = [seg(i, i + 1, "word " * 20) for i in range(10)]
+    per_segment = estimate_tokens("word " * 20) + 4
+
+    chunks = split_segments(segments, max_tokens=per_segment * 3)
+
+    assert [s for chunk in chunks for s in chunk] == segments
+    assert all(len(chunk) <= 3 for chunk in chunks)
+
+    # 达到软上限后遇到停顿即切分
+    paused = segments[:2] + [seg(20, 21, "word " * 20)] + segments[3:5]
+    chunks = split_segments(paused, max_tokens=per_segment * 2.5, soft_ratio=0.5)
+    assert chunks[0] == paused[:2]
@@ -0,0 +1,41 @@
+import time
+
+import pytest
+
+from app.db.llm_cache_dao import get_llm_cache, init_llm_cache_table, save_llm_cache
+
+
+@pytest.fixture(autouse=True)
+def llm_cache(sqlite_dir):
+    init_llm_cache_table()
+
+
+def test_roundtrip_and_overwrite():
+    save_llm_cache("k1", "gpt-4o", "openai", "first", max_entries=10)
+    save_llm_cache("k1", "gpt-4o", "openai", "second", max_entries=10)
+
+    assert get_llm_cache("k1") == "second"
+    assert get_llm_cache("missing") is None
+
+
+def test_evicts_oldest_entries_beyond_limit():
+    for key in ("a", "b", "c"):
+        save_llm_cache(key, "gpt-4o", None, key, max_entries=2)
+
+    assert get_llm_cache("a") is None
+    assert get_llm_cache("b") == "b"
+    assert get_llm_cache("c") == "c"
+
+
+def test_recent_hit_protects_entry_from_eviction():
+    save_llm_cache("a", "gpt-4o", None, "a", max_entries=2)
+    time.sleep(0.01)
+    save_llm_cache("b", "gpt-4o", None, "b", max_entries=2)
+    time.sleep(0.01)
+    # 同一秒内命中 a，a 变为最近使用，新条目写入时淘汰 b
+    assert get_llm_cache("a") == "a"
+    time.sleep(0.01)
+    save_llm_cache("c", "gpt-4o", None, "c", max_entries=2)
+
+    assert get_llm_cache("a") == "a"
+    assert get_llm_cache("b") is None
@@ -0,0 +1,108 @@
+import threading
+import time
+
+import pytest
+
+from app.db.note_job_dao import (
+    JOB_DONE,
+    claim_next_note_job,
+    count_note_jobs_by_status,
+    enqueue_note_job,
+    get_note_job_position,
+    init_note_job_table,
+    requeue_running_note_jobs,
+    update_note_job_status,
+)
+
+
+@pytest.fixture(autouse=True)
+def note_jobs(sqlite_dir):
+    init_note_job_table()
+
+
+def test_claim_in_fifo_order():
+    enqueue_note_job("a", {"n": 1})
+    enqueue_note_job("b", {"n": 2})
+
+    assert get_note_job_position("b") == 2
+    assert claim_next_note_job() == ("a", {"n": 1})
+    assert claim_next_note_job() == ("b", {"n": 2})
+    assert claim_next_note_job() is None
+    assert count_note_jobs_by_status() == {"running": 2}
+
+
+def test_concurrent_workers_never_claim_the_same_job():
+    for i in range(20):
+        enqueue_note_job(f"t{i}", {})
+    claimed = []
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            job = claim_next_note_job()
+            if job is None:
+                return
+            with lock:
+                claimed.append(job[0])
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(claimed) == sorted(f"t{i}" for i in range(20))
+
+
+def test_running_job_is_not_reset_by_retry():
+    enqueue_note_job("a", {"n": 1})
+    claim_next_note_job()
+
+    assert enqueue_note_job("a", {"n": 2}) is False
+    assert claim_next_note_job() is None
+
+    update_note_job_status("a", JOB_DONE)
+    assert enqueue_note_job("a", {"n": 2}) is True
+    assert claim_next_note_job() == ("a", {"n": 2})
+
+
+def test_requeue_running_jobs_after_restart():
+    enqueue_note_job("a", {})
+    enqueue_note_job("b", {})
+    claim_next_note_job()
+
+    assert requeue_running_note_jobs() == 1
+    assert count_note_jobs_by_status() == {"queued": 2}
+    assert claim_next_note_job()[0] == "a"
+
+
+def test_soft_failed_note_is_recorded_as_failed(monkeypatch):
+    from app.routers import note as note_router
+    from app.services.note import NoteGenerator
+    from app.services.task_queue import NoteTaskQueue
+
+    # generate() 捕获所有异常后返回 None，队列仍应把任务记为失败
+    monkeypatch.setattr(NoteGenerator, "generate", lambda self, **kwargs: None)
+    queue = NoteTaskQueue(handler=note_router.run_note_task, concurrency=1, poll_interval=0.05)
+    queue.submit("a", video_url="https://www.bilibili.com/video/BV1xx", platform="bilibili",
+                 quality="medium", model_name="gpt-4o", provider_id="openai")
+    queue.start()
+    try:
+        deadline = time.monotonic() + 5
+        while queue.stats()["failed"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        queue.stop()
+
+    assert queue.stats()["failed"] == 1
+    assert queue.stats()["done"] == 0
+
+
+def test_resubmitted_job_goes_to_the_back_of_the_queue():
+    enqueue_note_job("a", {})
+    enqueue_note_job("b", {})
+    enqueue_note_job("a", {"retry": True})
+
+    assert get_note_job_position("a") == 2
+    assert claim_next_note_job()[0] == "b"
+    assert claim_next_note_job() == ("a", {"retry": True})
@@ -0,0 +1,89 @@
+import time
+
+import pytest
+
+from app.models.audio_model import AudioDownloadResult
+from app.services import note as note_module
+from app.services.artifact_cache import ArtifactCache
+from app.services.note import NoteGenerator
+
+
+class FakeDownloader:
+    parallel_video_download = True
+
+    def __init__(self, video_error=None, audio_error=None, audio_delay=0.0):
+        self.video_error = video_error
+        self.audio_error = audio_error
+        self.audio_delay = audio_delay
+        self.video_finished = False
+
+    def download_video(self, video_url, output_dir=None):
+        time.sleep(0.2)
+        self.video_finished = True
+        if self.video_error:
+            raise self.video_error
+        return "/tmp/video.mp4"
+
+    def download(self, video_url, quality, output_dir=None, need_video=False):
+        time.sleep(self.audio_delay)
+        if self.audio_error:
+            raise self.audio_error
+        return AudioDownloadResult(file_path="/tmp/audio.mp3", title="t", duration=0, cover_url=None,
+                                   platform="youtube", video_id="abcdefghijk", raw_info={})
+
+
+@pytest.fixture
+def statuses(monkeypatch, tmp_path):
+    recorded = []
+    monkeypatch.setattr(note_module.task_status_registry, "set",
+                        lambda task_id, status, message=None: recorded.append(getattr(status, "value", status)))
+    monkeypatch.setattr(note_module, "artifact_cache", ArtifactCache(str(tmp_path / "artifacts")))
+    return recorded
+
+
+def _generate(downloader, transcribed):
+    generator = NoteGenerator()
+    generator._get_downloader = lambda platform: downloader
+    generator._get_gpt = lambda *args, **kwargs: None
+    generator._init_transcriber = lambda profile=None: None
+    generator._transcribe_audio = lambda **kwargs: transcribed.append(1)
+    return generator.generate("https://www.youtube.com/watch?v=abcdefghijk", "youtube",
+                              task_id="t1", screenshot=True)
+
+
+def test_video_failure_is_reported_once_after_join(statuses):
+    transcribed = []
+    result = _generate(FakeDownloader(video_error=RuntimeError("video boom"), audio_delay=0.4), transcribed)
+
+    assert result is None
+    # 视频分支先失败，转写被跳过，FAILED 只在汇合后写入一次且是最后一个状态
+    assert transcribed == []
+    assert statuses.count("FAILED") == 1
+    assert statuses[-1] == "FAILED"
+
+
+def test_audio_failure_waits_for_running_video_branch(statuses):
+    downloader = FakeDownloader(audio_error=RuntimeError("audio boom"))
+    result = _generate(downloader, [])
+
+    assert result is None
+    assert downloader.video_finished
+    assert statuses.count("FAILED") == 1
+
+
+def test_parallel_video_download_uses_its_own_directory(statuses):
+    output_dirs = {}
+
+    class RecordingDownloader(FakeDownloader):
+        def download_video(self, video_url, output_dir=None):
+            output_dirs["video"] = output_dir
+            return super().download_video(video_url, output_dir)
+
+        def download(self, video_url, quality, output_dir=None, need_video=False):
+            output_dirs["audio"] = output_dir
+            return super().download(video_url, quality, output_dir, need_video)
+
+    _generate(RecordingDownloader(), [])
+
+    assert output_dirs["video"] != output_dirs["audio"]
+    assert output_dirs["video"].startswith(output_dirs["audio"])
@@ -0,0 +1,38 @@
+from app.gpt.provider import OpenAI_compatible_provider as registry
+
+
+def test_clients_are_reused_and_keyed_without_plain_api_key(monkeypatch):
+    monkeypatch.setattr(registry, "_clients", registry.OrderedDict())
+
+    client = registry.get_openai_client(api_key="sk-secret", base_url="http://a/v1")
+
+    assert registry.get_openai_client(api_key="sk-secret", base_url="http://a/v1") is client
+    assert registry.get_openai_client(api_key="sk-other", base_url="http://a/v1") is not client
+    assert all("sk-secret" not in key for key in registry._clients)
+
+
+def test_evicted_and_invalidated_clients_stay_usable_by_holders(monkeypatch):
+    monkeypatch.setattr(registry, "_clients", registry.OrderedDict())
+    monkeypatch.setattr(registry, "OPENAI_CLIENT_CACHE_SIZE", 2)
+
+    first = registry.get_openai_client(api_key="k1", base_url="http://a/v1")
+    second = registry.get_openai_client(api_key="k2", base_url="http://a/v1")
+    registry.get_openai_client(api_key="k1", base_url="http://a/v1")  # k1 变为最近使用
+    registry.get_openai_client(api_key="k3", base_url="http://a/v1")
+    registry.invalidate_openai_client(api_key="k1", base_url="http://a/v1")
+
+    # 已移出注册表，但进行中的任务仍可继续使用
+    assert len(registry._clients) == 1
+    assert registry.get_openai_client(api_key="k1", base_url="http://a/v1") is not first
+    assert not first.is_closed()
+    assert not second.is_closed()
+
+
+def test_failed_connection_test_keeps_shared_client(monkeypatch):
+    monkeypatch.setattr(registry, "_clients", registry.OrderedDict())
+    client = registry.get_openai_client(api_key="k1", base_url="http://127.0.0.1:9/v1")
+    monkeypatch.setattr(client, "max_retries", 0)
+
+    assert registry.OpenAICompatibleProvider.test_connection(api_key="k1", base_url="http://127.0.0.1:9/v1") is False
+    assert registry.get_openai_client(api_key="k1", base_url="http://127.0.0.1:9/v1") is client
+    assert not client.is_closed()
@@ -0,0 +1,50 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.utils.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "audio"
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        leader = executor.submit(flight.do, "BV1xx", work)
+        started.wait(5)
+        followers = [executor.submit(flight.do, "BV1xx", work) for _ in range(3)]
+        # 留出时间让跟随者挂到进行中的调用上
+        time.sleep(0.2)
+        release.set()
+
+        assert leader.result() == ("audio", False)
+        assert [f.result() for f in followers] == [("audio", True)] * 3
+    assert len(calls) == 1
+
+
+def test_error_propagates_and_next_call_runs_again():
+    flight = SingleFlight()
+
+    def fail():
+        raise RuntimeError("download failed")
+
+    with pytest.raises(RuntimeError):
+        flight.do("key", fail)
+    assert flight.do("key", lambda: 42) == (42, False)
+
+
+def test_different_keys_run_independently():
+    flight = SingleFlight()
+
+    assert flight.do("a", lambda: 1) == (1, False)
+    assert flight.do("b", lambda: 2) == (2, False)
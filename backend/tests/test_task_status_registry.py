@@ -0,0 +1,23 @@
+import json
+
+from app.enmus.task_status_enums import TaskStatus
+from app.services.task_status_registry import TaskStatusRegistry
+
+
+def test_result_falls_back_to_disk(tmp_path):
+    registry = TaskStatusRegistry(output_dir=tmp_path)
+    (tmp_path / "t1.json").write_text(json.dumps({"markdown": "old"}), encoding="utf-8")
+
+    assert registry.get_result("t1") == {"markdown": "old"}
+
+
+def test_retry_clears_cached_and_persisted_result(tmp_path):
+    registry = TaskStatusRegistry(output_dir=tmp_path)
+    (tmp_path / "t1.json").write_text(json.dumps({"markdown": "old"}), encoding="utf-8")
+    registry.set_result("t1", {"markdown": "old"})
+
+    registry.clear_result("t1")
+    registry.set("t1", TaskStatus.PENDING)
+
+    assert registry.get_result("t1") is None
+    assert not (tmp_path / "t1.json").exists()
@@ -0,0 +1,13 @@
+from app.transcriber import transcriber_provider
+from app.transcriber.routing import RoutingTranscriber
+
+
+def test_auto_routes_only_without_explicit_profile(monkeypatch):
+    requested = []
+    monkeypatch.setattr(transcriber_provider, "get_whisper_transcriber",
+                        lambda model_size, device="cuda", profile=None: requested.append(profile) or "whisper")
+    monkeypatch.setitem(transcriber_provider._transcribers, transcriber_provider.TranscriberType.AUTO, None)
+
+    assert transcriber_provider.get_transcriber("auto", profile="accurate") == "whisper"
+    assert requested == ["accurate"]
+    assert isinstance(transcriber_provider.get_transcriber("auto"), RoutingTranscriber)
@@ -0,0 +1,49 @@
+from app.gpt.compaction import COMPACT_MAX_SECONDS, compact_segments, compact_transcript, strip_fillers
+from app.models.transcriber_model import TranscriptSegment
+
+
+def seg(start, end, text):
+    return TranscriptSegment(start=start, end=end, text=text)
+
+
+def test_strip_fillers_keeps_meaningful_words():
+    assert strip_fillers("嗯，那个方案可以") == "那个方案可以"
+    assert strip_fillers("嗯嗯。") == ""
+    assert strip_fillers("um, so this works") == "so this works"
+
+
+def test_compact_merges_short_segments_and_drops_repeats():
+    segments = [
+        seg(0, 2, "今天我们讲"),
+        seg(2, 4, "嗯"),
+        seg(4, 6, "缓存的设计"),
+        seg(6, 8, "谢谢观看"),
+        seg(8, 10, "谢谢观看"),
+    ]
+
+    compacted = compact_segments(segments)
+
+    assert len(compacted) == 1
+    assert compacted[0].start == 0
+    assert compacted[0].end == 10
+    assert compacted[0].text.count("谢谢观看") == 1
+    assert "嗯" not in compacted[0].text
+
+
+def test_compact_breaks_on_pause_and_max_duration():
+    long_run = [seg(i * 5, i * 5 + 5, f"part{i}") for i in range(10)]
+    paused = [seg(0, 2, "first"), seg(10, 12, "second")]
+
+    assert all(unit.end - unit.start <= COMPACT_MAX_SECONDS for unit in compact_segments(long_run))
+    assert [unit.text for unit in compact_segments(paused)] == ["first", "second"]
+
+
+def test_compact_transcript_reports_savings():
+    segments = [seg(i, i + 1, "嗯") if i % 2 else seg(i, i + 1, "内容") for i in range(10)]
+
+    _, stats = compact_transcript(segments, lambda s: f"00:00 - {s.text}")
+
+    assert stats.segments_before == 10
+    assert stats.tokens_after < stats.tokens_before
+    assert stats.saved_ratio > 0
+
@@ -0,0 +1,27 @@
+from app.gpt import universal_gpt
+from app.gpt.universal_gpt import UniversalGPT
+from app.models.gpt_model import GPTSource
+from app.models.transcriber_model import TranscriptSegment
+
+
+def test_chunked_summary_compacts_transcript_once(monkeypatch):
+    calls = []
+    original = universal_gpt.compact_transcript
+
+    def counting_compact(segments, format_line):
+        calls.append(len(segments))
+        return original(segments, format_line)
+
+    monkeypatch.setattr(universal_gpt, "compact_transcript", counting_compact)
+    monkeypatch.setattr(universal_gpt, "GPT_MAP_REDUCE", "on")
+    monkeypatch.setattr(universal_gpt, "GPT_CHUNK_TOKENS", 120)
+    monkeypatch.setattr(universal_gpt, "LLM_CACHE_ENABLED", False)
+    gpt = UniversalGPT(client=None, model="test", use_cache=False)
+    monkeypatch.setattr(gpt, "_request", lambda messages, on_token=None: "00:00 - 要点")
+
+    # 片段间有较长停顿，压缩后仍保留多段，每个分块包含多段
+    segments = [TranscriptSegment(start=i * 10, end=i * 10 + 4, text=f"第{i}段内容。" * 5) for i in range(12)]
+    source = GPTSource(title="t", segment=segments, tags=[], screenshot=False, link=False, video_img_urls=[])
+
+    assert gpt.summarize(source)
+    assert len(calls) == 1
@@ -0,0 +1,28 @@
+import pytest
+
+from app.validators.video_url_validator import is_supported_batch_url, is_supported_video_url
+
+
+@pytest.mark.parametrize("url", [
+    "https://www.youtube.com/playlist?list=PLabc-123",
+    "https://space.bilibili.com/123456/channel/collectiondetail?sid=789",
+    "https://space.bilibili.com/123456/channel/seriesdetail?sid=789&ctype=0",
+    "https://space.bilibili.com/123456/lists/789?type=season",
+    # 多P 视频使用普通视频链接
+    "https://www.bilibili.com/video/BV1vc411b7Wa?p=2",
+])
+def test_batch_accepts_playlists_collections_and_multipart_videos(url):
+    assert is_supported_batch_url(url)
+
+
+def test_collections_are_only_accepted_for_batch():
+    assert not is_supported_video_url("https://space.bilibili.com/123456/channel/collectiondetail?sid=789")
+
+
+@pytest.mark.parametrize("url", [
+    "https://space.bilibili.com/123456",
+    "https://space.bilibili.com/123456/channel/collectiondetail",
+    "https://example.com/playlist?list=abc",
+])
+def test_batch_rejects_unsupported_links(url):
+    assert not is_supported_batch_url(url)
@@ -0,0 +1,36 @@
+from app.transcriber.whisper import WhisperTranscriber
+from app.transcriber.whisper_profiles import get_whisper_profile
+
+
+def _transcriber(profile, compute_type="int8", device="cpu") -> WhisperTranscriber:
+    # 只测试签名，不加载模型
+    transcriber = WhisperTranscriber.__new__(WhisperTranscriber)
+    transcriber.model_size = "base"
+    transcriber.device = device
+    transcriber.profile = profile
+    transcriber.compute_type = compute_type
+    return transcriber
+
+
+def test_default_profile_keeps_legacy_signature(monkeypatch):
+    monkeypatch.delenv("WHISPER_BEAM_SIZE", raising=False)
+    monkeypatch.delenv("WHISPER_PROFILE", raising=False)
+
+    assert _transcriber(get_whisper_profile()).cache_signature() == "fast-whisper-base"
+    assert _transcriber(get_whisper_profile(), "float16", "cuda").cache_signature() == "fast-whisper-base"
+
+
+def test_env_overrides_change_signature(monkeypatch):
+    monkeypatch.delenv("WHISPER_PROFILE", raising=False)
+    monkeypatch.setenv("WHISPER_BEAM_SIZE", "1")
+    greedy = _transcriber(get_whisper_profile()).cache_signature()
+    monkeypatch.setenv("WHISPER_BEAM_SIZE", "3")
+    beam = _transcriber(get_whisper_profile()).cache_signature()
+
+    assert greedy != "fast-whisper-base"
+    assert greedy != beam
+    assert _transcriber(get_whisper_profile(), compute_type="float32").cache_signature() != beam
+
+
+def test_fast_profile_uses_device_default_compute_type():
+    assert get_whisper_profile("fast").compute_type is None
@@ -3,6 +3,8 @@ import { useTaskStore } from '@/store/taskStore'
 import { get_task_status } from '@/services/note.ts'
 import toast from 'react-hot-toast'
 
+const isFinished = (status?: string) => status === 'SUCCESS' || status === 'FAILED'
+
 export const useTaskPolling = (interval = 3000) => {
   const tasks = useTaskStore(state => state.tasks)
   const updateTaskContent = useTaskStore(state => state.updateTaskContent)
@@ -10,41 +12,90 @@ export const useTaskPolling = (interval = 3000) => {
   const removeTask = useTaskStore(state => state.removeTask)
 
   const tasksRef = useRef(tasks)
+  // 每个未完成任务一条 SSE 连接（task_id -> EventSource）
+  const sourcesRef = useRef<Map<string, EventSource>>(new Map())
 
   // 每次 tasks 更新，把最新的 tasks 同步进去
   useEffect(() => {
     tasksRef.current = tasks
   }, [tasks])
 
+  const applyStatus = (taskId: string, res: any) => {
+    const task = tasksRef.current.find(t => t.id === taskId)
+    const { status } = res
+    if (!task || !status || status === task.status) return
+
+    if (status === 'SUCCESS') {
+      const { markdown, transcript, audio_meta } = res.result
+      toast.success('笔记生成成功')
+      updateTaskContent(taskId, {
+        status,
+        markdown,
+        transcript,
+        audioMeta: audio_meta,
+      })
+    } else if (status === 'FAILED') {
+      updateTaskContent(taskId, { status })
+      console.warn(`⚠️ 任务 ${taskId} 失败`)
+    } else {
+      updateTaskContent(taskId, { status })
+    }
+  }
+
+  // 订阅后端推送的任务进度，替代定时轮询
+  useEffect(() => {
+    if (typeof EventSource === 'undefined') return
+    const sources = sourcesRef.current
+    const pendingIds = new Set(tasks.filter(task => !isFinished(task.status)).map(task => task.id))
+
+    for (const taskId of pendingIds) {
+      if (sources.has(taskId)) continue
+      const source = new EventSource(`/api/task_events/${taskId}`)
+      source.onmessage = event => {
+        const data = JSON.parse(event.data)
+        applyStatus(taskId, data)
+        if (isFinished(data.status)) {
+          source.close()
+          sources.delete(taskId)
+        }
+      }
+      source.onerror = () => {
+        // 连接异常时关闭，由下方的轮询兜底
+        console.warn(`⚠️ 任务 ${taskId} 推送连接断开，改为轮询`)
+        source.close()
+        sources.delete(taskId)
+      }
+      sources.set(taskId, source)
+    }
+
+    for (const [taskId, source] of sources) {
+      if (!pendingIds.has(taskId)) {
+        source.close()
+        sources.delete(taskId)
+      }
+    }
+  }, [tasks])
+
+  useEffect(() => {
+    const sources = sourcesRef.current
+    return () => {
+      sources.forEach(source => source.close())
+      sources.clear()
+    }
+  }, [])
+
+  // 兜底轮询：只处理没有推送连接的任务
   useEffect(() => {
     const timer = setInterval(async () => {
       const pendingTasks = tasksRef.current.filter(
-        task => task.status != 'SUCCESS' && task.status != 'FAILED'
+        task => !isFinished(task.status) && !sourcesRef.current.has(task.id)
       )
 
       for (const task of pendingTasks) {
         try {
           console.log('🔄 正在轮询任务：', task.id)
           const res = await get_task_status(task.id)
-          const { status } = res
-
-          if (status && status !== task.status) {
-            if (status === 'SUCCESS') {
-              const { markdown, transcript, audio_meta } = res.result
-              toast.success('笔记生成成功')
-              updateTaskContent(task.id, {
-                status,
-                markdown,
-                transcript,
-                audioMeta: audio_meta,
-              })
-            } else if (status === 'FAILED') {
-              updateTaskContent(task.id, { status })
-              console.warn(`⚠️ 任务 ${task.id} 失败`)
-            } else {
-              updateTaskContent(task.id, { status })
-            }
-          }
+          applyStatus(task.id, res)
         } catch (e) {
           console.error('❌ 任务轮询失败：', e)
           // toast.error(`生成失败 ${e.message || e}`)